@@ -1,5 +1,13 @@
-from . import project_funding
-from . import project_budget
-from . import project_deviz_wizard
-from . import project_activity
-from . import project_acquisition
\ No newline at end of file
+from . import project_perf
+from . import project_funding
+from . import project_budget
+from . import project_budget_rollup
+from . import project_deviz_wizard
+from . import project_deviz_import_job
+from . import project_budget_revision
+from . import project_cpm
+from . import project_activity
+from . import project_acquisition
+from . import project_funding_report
+from . import project_rebaseline_wizard
+from . import project_deviz_controller
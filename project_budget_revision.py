@@ -0,0 +1,320 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import base64
+import json
+import zlib
+
+from .project_deviz_wizard import DEVIZ_HEADERS
+
+# La fiecare REVISION_KEYFRAME_INTERVAL revizii se salvează devizul complet;
+# între ele se salvează doar diferențele față de revizia anterioară.
+REVISION_KEYFRAME_INTERVAL = 10
+
+
+def _encode_payload(data):
+    """dict -> JSON compact comprimat zlib, în base64 (formatul câmpurilor Binary)."""
+    raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return base64.b64encode(zlib.compress(raw, 6))
+
+
+def _decode_payload(value):
+    """Inversul lui `_encode_payload`; acceptă și memoryview (citire directă din SQL)."""
+    return json.loads(zlib.decompress(base64.b64decode(bytes(value))).decode('utf-8'))
+
+
+def _apply_delta(lines, delta):
+    """Aplică pe loc o diferență {'set': {nr_crt: valori}, 'del': [nr_crt]}."""
+    for key in delta.get('del', ()):
+        lines.pop(key, None)
+    lines.update(delta.get('set', {}))
+    return lines
+
+
+def _make_delta(old, new):
+    """Diferența dintre două stări ale devizului (dict nr_crt -> listă valori)."""
+    return {
+        'set': {key: values for key, values in new.items() if old.get(key) != values},
+        'del': [key for key in old if key not in new],
+    }
+
+
+class ProjectBudgetRevision(models.Model):
+    """Revizie (instantaneu) a devizului unui proiect.
+
+    Liniile sunt stocate comprimat, ca dict nr_crt -> valorile din DEVIZ_HEADERS.
+    Revizia 1, 11, 21 ... conține devizul complet (keyframe); celelalte doar
+    diferența față de revizia precedentă. Reconstrucția și comparația se fac
+    direct din SQL, fără a încărca liniile în ORM.
+    """
+    _name = 'project.budget.revision'
+    _description = 'Revizie deviz proiect'
+    _order = 'project_id, sequence desc'
+
+    _sql_constraints = [
+        (
+            'unique_revision_sequence',
+            'unique(project_id, sequence)',
+            'Numărul reviziei trebuie să fie unic în cadrul proiectului.'
+        ),
+    ]
+
+    project_id = fields.Many2one(
+        'project.funding',
+        string="Proiect",
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    sequence = fields.Integer(string="Revizia", required=True, readonly=True)
+    name = fields.Char(string="Descriere")
+    is_keyframe = fields.Boolean(string="Deviz complet", readonly=True)
+    payload = fields.Binary(string="Date", attachment=False, readonly=True)
+    line_count = fields.Integer(string="Nr. linii", readonly=True)
+    total = fields.Float(string="TOTAL", readonly=True)
+    user_id = fields.Many2one(
+        'res.users',
+        string="Utilizator",
+        default=lambda self: self.env.user,
+        readonly=True,
+    )
+
+    def _compute_display_name(self):
+        for rec in self:
+            label = "Rev. %d" % rec.sequence
+            rec.display_name = "%s - %s" % (label, rec.name) if rec.name else label
+
+    # ------------------------------
+    # Citirea devizului curent / a reviziilor
+    # ------------------------------
+    @api.model
+    def _current_lines(self, project):
+        """Liniile curente ale proiectului, ca dict nr_crt -> listă de valori (din SQL)."""
+        self.env['project.budget'].flush_model()
+        self.env.cr.execute(
+            "SELECT id, nr_crt, %s FROM project_budget WHERE project_id = %%s"
+            % ", ".join(DEVIZ_HEADERS),
+            [project.id],
+        )
+        return {
+            nr_crt or '#%d' % line_id: list(values)
+            for line_id, nr_crt, *values in self.env.cr.fetchall()
+        }
+
+    def _load_states(self, sequences):
+        """Reconstruiește devizul pentru numerele de revizie date, într-o singură trecere.
+
+        Citește doar lanțul de la keyframe-ul anterior celei mai vechi revizii până la
+        cea mai nouă. Returnează {sequence: dict nr_crt -> valori}.
+        """
+        self.ensure_one()
+        first, last = min(sequences), max(sequences)
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT sequence, is_keyframe, payload
+              FROM project_budget_revision
+             WHERE project_id = %(project_id)s
+               AND sequence <= %(last)s
+               AND sequence >= (
+                       SELECT COALESCE(max(sequence), 1)
+                         FROM project_budget_revision
+                        WHERE project_id = %(project_id)s
+                          AND is_keyframe
+                          AND sequence <= %(first)s
+                   )
+          ORDER BY sequence
+            """,
+            {'project_id': self.project_id.id, 'first': first, 'last': last},
+        )
+        states = {}
+        lines = {}
+        for sequence, is_keyframe, payload in self.env.cr.fetchall():
+            data = _decode_payload(payload)
+            lines = data if is_keyframe else _apply_delta(lines, data)
+            if sequence in sequences:
+                states[sequence] = dict(lines)
+        return states
+
+    def _get_lines(self):
+        self.ensure_one()
+        return self._load_states({self.sequence})[self.sequence]
+
+    # ------------------------------
+    # Creare revizie
+    # ------------------------------
+    @api.model
+    def _snapshot(self, project, name=False):
+        """Salvează devizul curent al proiectului ca revizie nouă."""
+        lines = self._current_lines(project)
+        last = self.search([('project_id', '=', project.id)], order='sequence desc', limit=1)
+        sequence = (last.sequence or 0) + 1
+        is_keyframe = not last or sequence % REVISION_KEYFRAME_INTERVAL == 1
+        payload = lines if is_keyframe else _make_delta(last._get_lines(), lines)
+        amount_idx = [
+            DEVIZ_HEADERS.index(col)
+            for col in ('chelt_elig_baza', 'chelt_elig_tva', 'chelt_neelig_baza', 'chelt_neelig_tva')
+        ]
+        return self.create({
+            'project_id': project.id,
+            'sequence': sequence,
+            'name': name,
+            'is_keyframe': is_keyframe,
+            'payload': _encode_payload(payload),
+            'line_count': len(lines),
+            'total': sum(values[idx] or 0.0 for values in lines.values() for idx in amount_idx),
+        })
+
+    def _restore(self):
+        """Înlocuiește liniile de deviz ale proiectului cu cele salvate în revizie."""
+        self.ensure_one()
+        project = self.project_id
+        project.budget_line_ids.unlink()
+        self.env['project.budget'].create([
+            dict(zip(DEVIZ_HEADERS, values), project_id=project.id)
+            for values in self._get_lines().values()
+        ])
+
+    def unlink(self):
+        # reviziile intermediare sunt baza pentru diferențele următoare
+        for rec in self:
+            later = self.search_count([
+                ('project_id', '=', rec.project_id.id),
+                ('sequence', '>', rec.sequence),
+                ('id', 'not in', self.ids),
+            ])
+            if later:
+                raise ValidationError(
+                    "Se poate șterge doar ultima revizie a devizului (revizia %d are revizii ulterioare)."
+                    % rec.sequence
+                )
+        return super().unlink()
+
+    # ------------------------------
+    # Comparare revizii
+    # ------------------------------
+    def _diff(self, other=None):
+        """Compară revizia cu `other` (altă revizie a aceluiași proiect sau devizul curent).
+
+        Cheia este nr_crt. Returnează un dict cu:
+          - added: [(nr_crt, valori)] liniile care apar doar în `other`;
+          - removed: [(nr_crt, valori)] liniile care apar doar în această revizie;
+          - changed: [(nr_crt, [(coloană, valoare veche, valoare nouă)])];
+          - unchanged: numărul de linii identice.
+        """
+        self.ensure_one()
+        if other:
+            if other.project_id != self.project_id:
+                raise ValidationError("Se pot compara doar revizii ale aceluiași proiect.")
+            states = self._load_states({self.sequence, other.sequence})
+            old, new = states[self.sequence], states[other.sequence]
+        else:
+            old, new = self._get_lines(), self._current_lines(self.project_id)
+
+        changed = []
+        unchanged = 0
+        for key in sorted(old.keys() & new.keys()):
+            if old[key] == new[key]:
+                unchanged += 1
+                continue
+            changed.append((key, [
+                (col, a, b)
+                for col, a, b in zip(DEVIZ_HEADERS, old[key], new[key])
+                if a != b
+            ]))
+        return {
+            'added': [(key, new[key]) for key in sorted(new.keys() - old.keys())],
+            'removed': [(key, old[key]) for key in sorted(old.keys() - new.keys())],
+            'changed': changed,
+            'unchanged': unchanged,
+        }
+
+    def _diff_report(self, other=None, max_lines=1000):
+        """Raport text al comparației, în formatul previzualizării din wizard-ul de import."""
+        diff = self._diff(other)
+        name_idx = DEVIZ_HEADERS.index('name')
+        report = [
+            "Linii noi: %d. Linii modificate: %d. Linii neschimbate: %d. Linii șterse: %d."
+            % (len(diff['added']), len(diff['changed']), diff['unchanged'], len(diff['removed'])),
+            "",
+        ]
+        report += ["+ %s %s" % (key, values[name_idx] or '') for key, values in diff['added']]
+        for key, diffs in diff['changed']:
+            report.append("~ %s: %s" % (key, "; ".join(
+                "%s: %s → %s" % (col, '' if a is None else a, '' if b is None else b)
+                for col, a, b in diffs
+            )))
+        report += ["- %s %s" % (key, values[name_idx] or '') for key, values in diff['removed']]
+        if len(report) > max_lines:
+            report = report[:max_lines] + ["... și încă %d linii." % (len(report) - max_lines)]
+        return "\n".join(report)
+
+    def action_compare(self):
+        """Deschide wizard-ul de comparare, cu revizia curentă preselectată."""
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Compară revizii deviz',
+            'res_model': 'project.budget.revision.compare.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_project_id': self.project_id.id,
+                'default_revision_from_id': self.id,
+            },
+        }
+
+
+class ProjectBudgetRevisionCompareWizard(models.TransientModel):
+    _name = 'project.budget.revision.compare.wizard'
+    _description = 'Comparare revizii deviz'
+
+    project_id = fields.Many2one('project.funding', string="Proiect", required=True)
+    revision_from_id = fields.Many2one(
+        'project.budget.revision',
+        string="Revizia de bază",
+        required=True,
+        domain="[('project_id', '=', project_id)]",
+    )
+    revision_to_id = fields.Many2one(
+        'project.budget.revision',
+        string="Compară cu",
+        domain="[('project_id', '=', project_id)]",
+        help="Dacă este gol, comparația se face cu devizul curent.",
+    )
+    report = fields.Text(string="Diferențe", readonly=True)
+
+    def action_compare(self):
+        self.ensure_one()
+        self.report = self.revision_from_id._diff_report(self.revision_to_id)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.budget.revision.compare.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+
+class ProjectFunding(models.Model):
+    _inherit = 'project.funding'
+
+    budget_revision_ids = fields.One2many(
+        'project.budget.revision',
+        'project_id',
+        string="Revizii deviz",
+    )
+
+    def action_create_deviz_revision(self):
+        """Salvează devizul curent ca revizie nouă."""
+        Revision = self.env['project.budget.revision']
+        for project in self:
+            Revision._snapshot(project)
+        return True
+
+    def _snapshot_deviz_before_import(self, file_name=False):
+        """Revizie automată înainte ca un import să modifice devizul existent; returnează reviziile."""
+        Revision = self.env['project.budget.revision']
+        for project in self.filtered('budget_line_ids'):
+            Revision |= Revision._snapshot(project, "Înainte de importul %s" % (file_name or ''))
+        return Revision
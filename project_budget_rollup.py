@@ -0,0 +1,114 @@
+from odoo import models, fields, api
+
+
+class ProjectBudgetRollup(models.Model):
+    """Subtotaluri deviz pe proiect / capitol / prefix de subcapitol.
+
+    Tabela este întreținută incremental din create / write / unlink pe
+    `project.budget` (vezi `_apply_lines`), nu recalculată la fiecare citire.
+    """
+    _name = 'project.budget.rollup'
+    _description = 'Subtotal deviz pe capitol'
+    _order = 'project_id, chapter, subchapter_prefix'
+    _rec_name = 'chapter'
+
+    _sql_constraints = [
+        (
+            'unique_rollup_key',
+            'unique(project_id, chapter, subchapter_prefix)',
+            'Subtotalul pe capitol trebuie să fie unic pentru fiecare proiect.'
+        ),
+    ]
+
+    project_id = fields.Many2one(
+        'project.funding',
+        string="Proiect",
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True,
+    )
+    chapter = fields.Char(string="Capitol", readonly=True)
+    subchapter_prefix = fields.Char(
+        string="Subcapitol",
+        readonly=True,
+        help="Primul segment al subcapitolului (ex. «1» pentru 1.1, 1.2).",
+    )
+    line_count = fields.Integer(string="Nr. linii", readonly=True)
+    total_eligibil = fields.Float(string="TOTAL ELIGIBIL", readonly=True)
+    total_neeligibil = fields.Float(string="TOTAL NEELIGIBIL", readonly=True)
+    total_tva = fields.Float(string="TOTAL TVA", readonly=True)
+    total = fields.Float(string="TOTAL", readonly=True)
+
+    # cheia de grupare, calculată la fel în reconstruire și în actualizarea incrementală
+    _KEY_SQL = """
+        line.project_id,
+        COALESCE(TRIM(line.chapter), ''),
+        COALESCE(SPLIT_PART(TRIM(line.subchapter), '.', 1), '')
+    """
+
+    def init(self):
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """Reconstruiește complet tabela din liniile de deviz."""
+        self.env['project.budget'].flush_model()
+        self.env.cr.execute("DELETE FROM project_budget_rollup")
+        self.env.cr.execute(
+            """
+            INSERT INTO project_budget_rollup (
+                project_id, chapter, subchapter_prefix, line_count,
+                total_eligibil, total_neeligibil, total_tva, total
+            )
+            SELECT %s,
+                   count(*),
+                   COALESCE(sum(line.total_eligibil), 0),
+                   COALESCE(sum(line.total_neeligibil), 0),
+                   COALESCE(sum(line.total_tva), 0),
+                   COALESCE(sum(line.total), 0)
+              FROM project_budget AS line
+          GROUP BY 1, 2, 3
+            """ % self._KEY_SQL
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _apply_lines(self, line_ids, sign):
+        """Adaugă (sign=1) sau scade (sign=-1) liniile date din subtotaluri.
+
+        Liniile sunt citite din baza de date, deci apelantul face flush înainte.
+        Subtotalurile rămase fără linii sunt șterse.
+        """
+        if not line_ids:
+            return
+        self.env.cr.execute(
+            """
+            INSERT INTO project_budget_rollup AS rollup (
+                project_id, chapter, subchapter_prefix, line_count,
+                total_eligibil, total_neeligibil, total_tva, total
+            )
+            SELECT %s,
+                   %%(sign)s * count(*),
+                   %%(sign)s * COALESCE(sum(line.total_eligibil), 0),
+                   %%(sign)s * COALESCE(sum(line.total_neeligibil), 0),
+                   %%(sign)s * COALESCE(sum(line.total_tva), 0),
+                   %%(sign)s * COALESCE(sum(line.total), 0)
+              FROM project_budget AS line
+             WHERE line.id IN %%(ids)s
+          GROUP BY 1, 2, 3
+                ON CONFLICT (project_id, chapter, subchapter_prefix) DO UPDATE SET
+                   line_count = rollup.line_count + EXCLUDED.line_count,
+                   total_eligibil = rollup.total_eligibil + EXCLUDED.total_eligibil,
+                   total_neeligibil = rollup.total_neeligibil + EXCLUDED.total_neeligibil,
+                   total_tva = rollup.total_tva + EXCLUDED.total_tva,
+                   total = rollup.total + EXCLUDED.total
+         RETURNING rollup.id, rollup.line_count
+            """ % self._KEY_SQL,
+            {'sign': sign, 'ids': tuple(line_ids)},
+        )
+        # doar subtotalurile atinse de acest lot pot rămâne fără linii
+        empty_ids = tuple(rollup_id for rollup_id, line_count in self.env.cr.fetchall() if line_count <= 0)
+        if empty_ids:
+            self.env.cr.execute("DELETE FROM project_budget_rollup WHERE id IN %s", [empty_ids])
+        self.invalidate_model()
@@ -0,0 +1,84 @@
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class ProjectCpmMixin(models.AbstractModel):
+    """Câmpurile de drum critic (CPM) comune activităților și achizițiilor.
+
+    Valorile se calculează la cerere din project.funding._cpm_analysis, păstrată în
+    cache pe proiect; nu se stochează.
+    """
+    _name = 'project.cpm.mixin'
+    _description = 'Analiză drum critic'
+
+    # declarate aici pentru dependențele calculului; modelele concrete le redefinesc
+    project_id = fields.Many2one('project.funding', string='Proiect')
+    date_start = fields.Date(string='Data început')
+    date_end = fields.Date(string='Data sfârșit')
+
+    early_start = fields.Date(string='Început timpuriu', compute='_compute_cpm')
+    early_finish = fields.Date(string='Sfârșit timpuriu', compute='_compute_cpm')
+    late_start = fields.Date(string='Început târziu', compute='_compute_cpm')
+    late_finish = fields.Date(string='Sfârșit târziu', compute='_compute_cpm')
+    total_slack = fields.Integer(string='Rezervă totală (zile)', compute='_compute_cpm')
+    is_critical = fields.Boolean(
+        string='Pe drumul critic',
+        compute='_compute_cpm',
+        search='_search_is_critical',
+    )
+
+    @api.depends('project_id', 'date_start', 'date_end')
+    def _compute_cpm(self):
+        analysis = self.project_id._cpm_analysis()
+        for rec in self:
+            values = analysis.get(rec.project_id.id, {}).get((rec._name, rec.id))
+            (
+                rec.early_start, rec.early_finish, rec.late_start,
+                rec.late_finish, rec.total_slack, rec.is_critical,
+            ) = values or (False, False, False, False, 0, False)
+
+    @api.model
+    def _cpm_search_projects(self):
+        """Proiectele din context (acțiune deschisă dintr-un proiect), altfel None."""
+        ctx = self.env.context
+        project_ids = []
+        if ctx.get('default_project_id'):
+            project_ids = [ctx['default_project_id']]
+        elif ctx.get('active_model') == 'project.funding':
+            project_ids = ctx.get('active_ids') or ([ctx['active_id']] if ctx.get('active_id') else [])
+        if not project_ids:
+            return None
+        return self.env['project.funding'].browse(project_ids).exists()
+
+    def _search_is_critical(self, operator, value):
+        if operator in ('=', '!='):
+            operator, value = ('in' if operator == '=' else 'not in'), [value]
+        if operator not in ('in', 'not in'):
+            raise UserError(
+                "Operator nesuportat pentru «Pe drumul critic»: %s. "
+                "Operatori acceptați: =, !=, in, not in." % operator
+            )
+        critical = (True in value) == (operator == 'in')
+
+        projects = self._cpm_search_projects()
+        if projects is not None:
+            analyses = projects._cpm_analysis()
+            project_domain = [('project_id', 'in', projects.ids)]
+        else:
+            # fără proiect în context: doar proiectele cu înregistrări, fără a umple
+            # cache-ul CPM (altfel parcurgerea ar evacua intrările proiectelor deschise)
+            projects = self.env['project.funding'].browse([
+                project.id for [project] in self._read_group([], groupby=['project_id'])
+            ])
+            analyses = projects._cpm_analysis(store_cache=False)
+            project_domain = []
+
+        critical_ids = [
+            rec_id
+            for analysis in analyses.values()
+            for (model, rec_id), values in analysis.items()
+            if model == self._name and values[5]
+        ]
+        if critical:
+            return [('id', 'in', critical_ids)]
+        return project_domain + [('id', 'not in', critical_ids)]
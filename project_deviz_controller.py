@@ -0,0 +1,44 @@
+import tempfile
+
+from werkzeug.wsgi import wrap_file
+
+from odoo import http
+from odoo.http import request, content_disposition
+
+
+class ProjectDevizController(http.Controller):
+
+    @http.route('/project_funding/deviz/export/<int:project_id>', type='http', auth='user')
+    def export_deviz(self, project_id, format='xlsx', **kwargs):
+        """Descărcare deviz XLSX / Parquet în flux (memorie constantă, fără salvare în baza de date).
+
+        Fișierul este scris într-un fișier temporar pe disc, apoi trimis
+        browserului pe bucăți.
+        """
+        project = request.env['project.funding'].browse(project_id).exists()
+        if not project:
+            raise request.not_found()
+        project.check_access('read')
+
+        ExportWizard = request.env['project.deviz.export.wizard']
+        if format == 'parquet':
+            extension, content_type = 'parquet', 'application/vnd.apache.parquet'
+            output = tempfile.TemporaryFile(suffix='.parquet')
+            ExportWizard._write_deviz_parquet(project, output)
+        else:
+            extension, content_type = 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            output = tempfile.TemporaryFile(suffix='.xlsx')
+            ExportWizard._write_deviz_xlsx(project, output)
+        size = output.seek(0, 2)
+        output.seek(0)
+
+        filename = f"deviz_{project.cod or 'proiect'}.{extension}"
+        headers = [
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(filename)),
+            ('Content-Length', str(size)),
+        ]
+        return request.make_response(
+            wrap_file(request.httprequest.environ, output),
+            headers=headers,
+        )
@@ -0,0 +1,327 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import base64
+import logging
+import time
+from datetime import timedelta
+
+from odoo.tools import split_every
+
+from .project_deviz_wizard import IMPORT_BATCH_SIZE
+from .project_perf import profiled
+
+_logger = logging.getLogger(__name__)
+
+# Un job «În lucru» fără semn de viață de atâtea minute este considerat întrerupt
+# (worker oprit de limita de timp, OOM sau repornire)
+IMPORT_JOB_STALE_MINUTES = 60
+
+
+class ProjectDevizImportJob(models.Model):
+    _name = 'project.deviz.import.job'
+    _description = 'Job import deviz'
+    _order = 'id desc'
+
+    project_id = fields.Many2one(
+        'project.funding',
+        string="Proiect",
+        required=True,
+        ondelete='cascade',
+        index=True,
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string="Utilizator",
+        default=lambda self: self.env.user,
+        readonly=True,
+    )
+    file_data = fields.Binary(string="Fișier", attachment=True, required=True)
+    file_name = fields.Char(string="Nume fișier")
+    import_mode = fields.Selection(
+        [
+            ('replace', 'Înlocuiește devizul'),
+            ('sync', 'Sincronizează după Nr. crt'),
+        ],
+        string="Mod import",
+        default='replace',
+        required=True,
+    )
+    delete_missing = fields.Boolean(string="Șterge liniile care lipsesc din fișier")
+
+    state = fields.Selection(
+        [
+            ('pending', 'În așteptare'),
+            ('running', 'În lucru'),
+            ('done', 'Finalizat'),
+            ('failed', 'Eșuat'),
+        ],
+        string="Stare",
+        default='pending',
+        required=True,
+        index=True,
+    )
+    date_start = fields.Datetime(string="Început", readonly=True)
+    date_end = fields.Datetime(string="Sfârșit", readonly=True)
+    date_heartbeat = fields.Datetime(
+        string="Ultima activitate",
+        readonly=True,
+        help="Actualizată la pornire și după fiecare lot confirmat.",
+    )
+    rows_done = fields.Integer(string="Linii importate", readonly=True)
+    rows_failed = fields.Integer(string="Linii cu erori", readonly=True)
+    rows_per_sec = fields.Float(string="Linii / secundă", readonly=True, digits=(16, 1))
+    error_log = fields.Text(string="Erori", readonly=True)
+    revision_id = fields.Many2one(
+        'project.budget.revision',
+        string="Revizie înainte de import",
+        readonly=True,
+        ondelete='set null',
+        help="Devizul salvat înainte de import; se restaurează dacă importul complet eșuează.",
+    )
+
+    # ------------------------------
+    # Worker (ir.cron)
+    # ------------------------------
+    @api.model
+    def _stale_limit(self):
+        return fields.Datetime.now() - timedelta(minutes=IMPORT_JOB_STALE_MINUTES)
+
+    def _is_stale(self):
+        self.ensure_one()
+        heartbeat = self.date_heartbeat or self.date_start
+        return self.state == 'running' and (not heartbeat or heartbeat < self._stale_limit())
+
+    @api.model
+    def _recover_stale_jobs(self):
+        """Joburile rămase «În lucru» după oprirea worker-ului trec în «Eșuat» (devizul
+        se restaurează ca la orice eșec), ca să poată fi repuse în coadă."""
+        self.env.cr.execute(
+            """
+            SELECT id FROM project_deviz_import_job
+             WHERE state = 'running'
+               AND COALESCE(date_heartbeat, date_start, create_date) < %s
+               FOR UPDATE SKIP LOCKED
+            """,
+            [self._stale_limit()],
+        )
+        for job in self.browse([row[0] for row in self.env.cr.fetchall()]):
+            job = job.with_user(job.user_id or self.env.user)
+            job._restore_before_import()
+            job.write({
+                'state': 'failed',
+                'date_end': fields.Datetime.now(),
+                'error_log': "\n".join(filter(None, [
+                    job.error_log,
+                    "Jobul a fost întrerupt (fără activitate de peste %d minute)." % IMPORT_JOB_STALE_MINUTES,
+                ])),
+            })
+            self.env.cr.commit()
+
+    @api.model
+    def _cron_process_jobs(self, limit=10):
+        """Procesează joburile în așteptare, unul câte unul (apelat de ir.cron).
+
+        Fiecare job rulează cu drepturile utilizatorului care l-a trimis.
+        """
+        self._recover_stale_jobs()
+        for _i in range(limit):
+            # blocăm jobul, ca două procese cron să nu-l preia simultan
+            self.env.cr.execute(
+                """
+                SELECT id FROM project_deviz_import_job
+                 WHERE state = 'pending'
+              ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+                """
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job.with_user(job.user_id or self.env.user)._process()
+
+    @profiled('Import deviz (job)')
+    def _process(self):
+        self.ensure_one()
+        now = fields.Datetime.now()
+        self.write({'state': 'running', 'date_start': now, 'date_heartbeat': now})
+        self.env.cr.commit()
+
+        try:
+            if self.import_mode == 'sync':
+                self.project_id._snapshot_deviz_before_import(self.file_name)
+                self._process_sync()
+            else:
+                self._process_replace()
+        except Exception as e:
+            self.env.cr.rollback()
+            self.env.clear()
+            _logger.exception("Job import deviz %s eșuat", self.id)
+            self._restore_before_import()
+            self.write({
+                'state': 'failed',
+                'date_end': fields.Datetime.now(),
+                'error_log': "\n".join(filter(None, [self.error_log, str(e)])),
+            })
+        else:
+            self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+        self.env.cr.commit()
+
+    def _open_rows(self):
+        Wizard = self.env['project.deviz.import.wizard']
+        data = base64.b64decode(self.file_data)
+        return Wizard._iter_file_rows(data, self.file_name)
+
+    def _process_sync(self):
+        """Sincronizarea după Nr. crt rulează într-o singură tranzacție."""
+        started = time.perf_counter()
+        headers, rows = self._open_rows()
+        stats = self.env['project.deviz.import.wizard']._sync_budget_lines(
+            self.project_id, headers, rows, self.delete_missing,
+        )
+        done = stats['created'] + stats['updated']
+        self.write({
+            'rows_done': done,
+            'rows_per_sec': done / max(time.perf_counter() - started, 1e-6),
+            'error_log': (
+                "Adăugate: %(created)d, modificate: %(updated)d, "
+                "șterse: %(deleted)d, neschimbate: %(unchanged)d." % stats
+            ),
+        })
+
+    def _valid_rows(self, rows, errors):
+        """Valorile liniilor din fișier, ca (număr rând, vals); rândurile greșite trec în `errors`."""
+        Wizard = self.env['project.deviz.import.wizard']
+        BudgetLine = self.env['project.budget']
+        project = self.project_id
+        seen = set()
+        # numărul rândului vine din fișier (include rândurile goale sărite)
+        for row_no, row in rows:
+            try:
+                vals = Wizard._prepare_budget_line_vals(project, row)
+            except (TypeError, ValueError) as e:
+                errors.append("Rândul %d: valoare invalidă (%s)." % (row_no, e))
+                continue
+            nr_crt = BudgetLine._make_nr_crt(vals['chapter'], vals['subchapter']) or ''
+            if nr_crt in seen:
+                errors.append("Rândul %d: Nr. crt «%s» este duplicat în fișier." % (row_no, nr_crt))
+                continue
+            seen.add(nr_crt)
+            yield row_no, vals
+
+    def _process_replace(self):
+        """Import complet, în loturi de IMPORT_BATCH_SIZE confirmate (commit) pe rând.
+
+        Fișierul este citit complet o dată înainte de a modifica devizul, deci un
+        fișier corupt nu șterge nimic. Liniile existente se șterg în aceeași
+        tranzacție cu primul lot; revizia salvată la început este restaurată dacă
+        importul eșuează ulterior (vezi _restore_before_import).
+        Un lot care eșuează este reluat linie cu linie, iar liniile greșite sunt
+        doar trecute în jurnalul de erori; restul importului continuă.
+        """
+        project = self.project_id
+
+        # revizia este confirmată înaintea oricărei modificări: fără ea, proiectul nu
+        # avea deviz și restaurarea înseamnă doar ștergerea liniilor importate
+        self.revision_id = project._snapshot_deviz_before_import(self.file_name)[:1]
+        self.env.cr.commit()
+
+        # prima trecere: citire și validare, fără scrieri
+        _headers, rows = self._open_rows()
+        errors = []
+        for _row in self._valid_rows(rows, errors):
+            pass
+
+        if project.budget_line_ids:
+            project.budget_line_ids.unlink()
+
+        started = time.perf_counter()
+        _headers, rows = self._open_rows()
+        done = 0
+        for chunk in split_every(IMPORT_BATCH_SIZE, self._valid_rows(rows, []), list):
+            done += self._create_chunk(chunk, errors)
+            self.write({
+                'rows_done': done,
+                'rows_failed': len(errors),
+                'rows_per_sec': done / max(time.perf_counter() - started, 1e-6),
+                'error_log': "\n".join(errors) or False,
+                'date_heartbeat': fields.Datetime.now(),
+            })
+            self.env.cr.commit()
+
+    def _create_chunk(self, chunk, errors):
+        """Creează un lot de linii; la eroare reia lotul linie cu linie. Returnează numărul creat."""
+        BudgetLine = self.env['project.budget']
+        try:
+            with self.env.cr.savepoint():
+                BudgetLine.create([vals for _row_no, vals in chunk])
+                self.env.flush_all()
+            self.env.invalidate_all()
+            return len(chunk)
+        except Exception:
+            self.env.clear()
+
+        created = 0
+        for row_no, vals in chunk:
+            try:
+                with self.env.cr.savepoint():
+                    BudgetLine.create(vals)
+                    self.env.flush_all()
+                created += 1
+            except Exception as e:
+                self.env.clear()
+                errors.append("Rândul %d: %s" % (row_no, e))
+        self.env.invalidate_all()
+        return created
+
+    def _restore_before_import(self):
+        """După un import complet eșuat: devizul revine la revizia salvată înainte de import
+        (sau rămâne gol, dacă proiectul nu avea deviz). Se apelează după rollback."""
+        self.ensure_one()
+        if self.import_mode != 'replace' or self.state != 'running':
+            return
+        try:
+            with self.env.cr.savepoint():
+                if self.revision_id:
+                    self.revision_id._restore()
+                else:
+                    self.project_id.budget_line_ids.unlink()
+                self.env.flush_all()
+        except Exception:
+            self.env.clear()
+            _logger.exception("Job import deviz %s: devizul nu a putut fi restaurat", self.id)
+
+    def action_requeue(self):
+        """Repune în coadă joburile eșuate sau întrerupte («În lucru» fără activitate)."""
+        active = self.filtered(lambda job: job.state == 'running' and not job._is_stale())
+        if active:
+            raise ValidationError(
+                "Jobul %s este încă în lucru; poate fi repus în coadă după %d minute fără activitate."
+                % (active[0].id, IMPORT_JOB_STALE_MINUTES)
+            )
+        for job in self.filtered(lambda job: job.state == 'running'):
+            job._restore_before_import()
+        self.filtered(lambda job: job.state in ('failed', 'running')).write({
+            'state': 'pending',
+            'rows_done': 0,
+            'rows_failed': 0,
+            'rows_per_sec': 0.0,
+            'error_log': False,
+            'date_start': False,
+            'date_end': False,
+            'date_heartbeat': False,
+            'revision_id': False,
+        })
+        self.env.ref('project_funding.ir_cron_project_deviz_import_job')._trigger()
+        return True
+
+
+class ProjectFunding(models.Model):
+    _inherit = 'project.funding'
+
+    deviz_import_job_ids = fields.One2many(
+        'project.deviz.import.job',
+        'project_id',
+        string="Joburi import deviz",
+    )
@@ -1,306 +1,1338 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
-import base64
-import csv
-from io import StringIO, BytesIO
-
-
-class ProjectDevizExportWizard(models.TransientModel):
-    _name = 'project.deviz.export.wizard'
-    _description = 'Export Deviz Proiect'
-
-    project_id = fields.Many2one(
-        'project.funding',
-        string="Proiect",
-        required=True,
-        readonly=True,
-    )
-    file_data = fields.Binary(string="Fișier", readonly=True)
-    file_name = fields.Char(string="Nume fișier", readonly=True)
-
-    @api.model
-    def default_get(self, fields_list):
-        res = super().default_get(fields_list)
-        if (
-            self.env.context.get('active_model') == 'project.funding'
-            and self.env.context.get('active_id')
-        ):
-            res['project_id'] = self.env.context['active_id']
-        return res
-
-    def action_export(self):
-        """Exportă devizul proiectului în format XLSX (Excel)."""
-        self.ensure_one()
-
-        # import local, ca să nu blocăm modulul dacă lipsește librăria
-        try:
-            import xlsxwriter
-        except ImportError:
-            raise ValidationError(
-                "Pentru export în Excel (.xlsx) este necesar pachetul 'xlsxwriter' "
-                "instalat pe serverul Odoo.\n"
-                "Până atunci, putem adapta exportul pe CSV."
-            )
-
-        lines = self.project_id.budget_line_ids.sorted(
-            key=lambda l: (l.chapter or '', l.subchapter or '', l.id)
-        )
-
-        # Structura comună pentru export/import
-        headers = [
-            'chapter',
-            'subchapter',
-            'name',
-            'chelt_elig_baza',
-            'chelt_elig_tva',
-            'chelt_neelig_baza',
-            'chelt_neelig_tva',
-            'tip_cheltuiala',
-            'mysmis',
-            'total_chelt_eligibile_neramb',
-            'total_chelt_eligibile_aport',
-        ]
-
-        output = BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        sheet = workbook.add_worksheet('Deviz')
-
-        # Header
-        for col, field in enumerate(headers):
-            sheet.write(0, col, field)
-
-        # Linii
-        row = 1
-        for l in lines:
-            sheet.write(row, 0, l.chapter or '')
-            sheet.write(row, 1, l.subchapter or '')
-            sheet.write(row, 2, l.name or '')
-            sheet.write(row, 3, l.chelt_elig_baza or 0.0)
-            sheet.write(row, 4, l.chelt_elig_tva or 0.0)
-            sheet.write(row, 5, l.chelt_neelig_baza or 0.0)
-            sheet.write(row, 6, l.chelt_neelig_tva or 0.0)
-            sheet.write(row, 7, l.tip_cheltuiala or '')
-            sheet.write(row, 8, l.mysmis or '')
-            sheet.write(row, 9, l.total_chelt_eligibile_neramb or 0.0)
-            sheet.write(row, 10, l.total_chelt_eligibile_aport or 0.0)
-            row += 1
-
-        workbook.close()
-        data = output.getvalue()
-        output.close()
-
-        cod = self.project_id.cod or 'proiect'
-        self.file_name = f"deviz_{cod}.xlsx"
-        self.file_data = base64.b64encode(data)
-
-        return {
-            'type': 'ir.actions.act_window',
-            'res_model': 'project.deviz.export.wizard',
-            'view_mode': 'form',
-            'res_id': self.id,
-            'target': 'new',
-        }
-
-
-class ProjectDevizImportWizard(models.TransientModel):
-    _name = 'project.deviz.import.wizard'
-    _description = 'Import Deviz Proiect'
-
-    project_id = fields.Many2one(
-        'project.funding',
-        string="Proiect",
-        required=True,
-        readonly=True,
-    )
-    file_data = fields.Binary(string="Fișier (XLSX/CSV)", required=True)
-    file_name = fields.Char(string="Nume fișier")
-    confirm_override = fields.Boolean(
-        string="Șterge liniile de deviz existente",
-        help="Bifează această opțiune pentru a șterge liniile de deviz existente înainte de import.",
-    )
-
-    @api.model
-    def default_get(self, fields_list):
-        res = super().default_get(fields_list)
-        if (
-            self.env.context.get('active_model') == 'project.funding'
-            and self.env.context.get('active_id')
-        ):
-            res['project_id'] = self.env.context['active_id']
-        return res
-
-    def _read_rows_from_file(self):
-        """Citește fișierul încărcat și returnează o listă de dict-uri (rânduri)."""
-        if not self.file_data:
-            raise ValidationError("Încărcați un fișier pentru import.")
-
-        data = base64.b64decode(self.file_data)
-        filename = (self.file_name or "").lower()
-        rows = []
-        headers = []
-
-        # 1) XLSX (Excel modern)
-        if filename.endswith('.xlsx'):
-            try:
-                import openpyxl
-            except ImportError:
-                raise ValidationError(
-                    "Pentru import din Excel (.xlsx) este necesar pachetul 'openpyxl' "
-                    "instalat pe serverul Odoo.\n"
-                    "Alternativ, salvați fișierul ca CSV (delimitat de punct și virgulă) și importați din nou."
-                )
-
-            wb = openpyxl.load_workbook(BytesIO(data), data_only=True)
-            sheet = wb.active
-
-            header_row = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True))
-            headers = [h or '' for h in header_row]
-            if not any(headers):
-                raise ValidationError("Fișier XLSX invalid sau fără header pe primul rând.")
-
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                if row is None or all(cell is None for cell in row):
-                    continue
-                vals = {
-                    headers[i]: (row[i] if i < len(row) and row[i] is not None else "")
-                    for i in range(len(headers))
-                }
-                rows.append(vals)
-
-        # 2) XLS (Excel vechi)
-        elif filename.endswith('.xls'):
-            try:
-                import xlrd
-            except ImportError:
-                raise ValidationError(
-                    "Pentru import din Excel (.xls) este necesar pachetul 'xlrd' "
-                    "instalat pe serverul Odoo.\n"
-                    "Alternativ, salvați fișierul ca XLSX sau CSV și importați din nou."
-                )
-
-            wb = xlrd.open_workbook(file_contents=data)
-            sh = wb.sheet_by_index(0)
-
-            headers = [str(h or '') for h in sh.row_values(0)]
-            if not any(headers):
-                raise ValidationError("Fișier XLS invalid sau fără header pe primul rând.")
-
-            for rx in range(1, sh.nrows):
-                row_vals = sh.row_values(rx)
-                if not any(row_vals):
-                    continue
-                vals = {}
-                for idx, header in enumerate(headers):
-                    vals[header] = row_vals[idx] if idx < len(row_vals) else ""
-                rows.append(vals)
-
-        # 3) CSV (fallback)
-        else:
-            try:
-                text = data.decode('utf-8-sig')
-            except UnicodeDecodeError:
-                raise ValidationError(
-                    "Fișierul nu pare a fi CSV UTF-8.\n"
-                    "Pentru import din Excel, folosiți XLSX sau CSV (UTF-8, delimitat de ';')."
-                )
-
-            reader = csv.DictReader(StringIO(text), delimiter=';')
-            if not reader.fieldnames:
-                raise ValidationError("Fișier CSV invalid sau fără header pe primul rând.")
-            headers = reader.fieldnames
-            rows = list(reader)
-
-        # Validăm coloanele obligatorii
-        required_cols = ['chapter', 'subchapter', 'name']
-        header_set = set(headers or (rows[0].keys() if rows else []))
-
-        for col in required_cols:
-            if col not in header_set:
-                raise ValidationError(
-                    f"Coloana obligatorie «{col}» lipsește din fișier.\n"
-                    f"Header așteptat: {', '.join(required_cols)}."
-                )
-
-        return rows
-
-    def action_import(self):
-        self.ensure_one()
-        project = self.project_id
-
-        if project.budget_line_ids and not self.confirm_override:
-            raise ValidationError(
-                "Proiectul are deja linii de deviz.\n"
-                "Bifează opțiunea «Șterge liniile de deviz existente» pentru a continua importul."
-            )
-
-        rows = self._read_rows_from_file()
-
-        # Helper pentru a converti orice valoare în string "curat"
-        def _s(val):
-            if val is None:
-                return ''
-            if isinstance(val, (int, float)):
-                text = str(val)
-                # opțional: dacă e 1.0, îl facem "1"
-                if text.endswith('.0'):
-                    text = text[:-2]
-                return text.strip()
-            return str(val).strip()
-
-        # Verificăm dubluri în fișier (același capitol + subcapitol)
-        seen = set()
-        cleaned_rows = []
-        for row in rows:
-            ch = _s(row.get('chapter'))
-            sub = _s(row.get('subchapter'))
-            key = (ch, sub)
-            if key in seen:
-                raise ValidationError(
-                    f"Fișierul conține linii duplicate pentru capitol «{ch}» și subcapitol «{sub}»."
-                )
-            seen.add(key)
-            cleaned_rows.append(row)
-
-        # Ștergem liniile existente dacă e cazul
-        if project.budget_line_ids:
-            project.budget_line_ids.unlink()
-
-        BudgetLine = self.env['project.budget']
-
-        def _f(val):
-            if val is None:
-                return 0.0
-            if isinstance(val, (int, float)):
-                return float(val)
-            val = str(val).strip()
-            if not val:
-                return 0.0
-            # acceptăm atât 1234.56 cât și 1234,56
-            return float(val.replace(',', '.'))
-
-        # Creăm noile linii
-        for row in cleaned_rows:
-            vals = {
-                'project_id': project.id,
-                'chapter': _s(row.get('chapter')),
-                'subchapter': _s(row.get('subchapter')),
-                'name': _s(row.get('name')),
-                'chelt_elig_baza': _f(row.get('chelt_elig_baza')),
-                'chelt_elig_tva': _f(row.get('chelt_elig_tva')),
-                'chelt_neelig_baza': _f(row.get('chelt_neelig_baza')),
-                'chelt_neelig_tva': _f(row.get('chelt_neelig_tva')),
-                'tip_cheltuiala': _s(row.get('tip_cheltuiala')),
-                'mysmis': _s(row.get('mysmis')),
-                'total_chelt_eligibile_neramb': _f(row.get('total_chelt_eligibile_neramb')),
-                'total_chelt_eligibile_aport': _f(row.get('total_chelt_eligibile_aport')),
-            }
-            BudgetLine.create(vals)
-
-        # Revenim pe proiect
-        return {
-            'type': 'ir.actions.act_window',
-            'res_model': 'project.funding',
-            'view_mode': 'form',
-            'res_id': project.id,
-            'target': 'current',
-        }
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+import base64
+import csv
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, TextIOWrapper
+
+from odoo.tools import float_compare, split_every
+from odoo.tools.safe_eval import safe_eval
+
+from .project_perf import profiled
+
+_logger = logging.getLogger(__name__)
+
+# Numărul de linii de deviz create într-un singur apel create() (multi-create).
+# Calculele stocate, constrângerile și totalurile proiectului rulează o dată pe lot.
+IMPORT_BATCH_SIZE = 1000
+
+# Coloanele care trebuie să existe în header-ul fișierului de import
+IMPORT_REQUIRED_COLUMNS = ['chapter', 'subchapter', 'name']
+
+# Structura comună pentru export/import
+DEVIZ_HEADERS = [
+    'chapter',
+    'subchapter',
+    'name',
+    'chelt_elig_baza',
+    'chelt_elig_tva',
+    'chelt_neelig_baza',
+    'chelt_neelig_tva',
+    'tip_cheltuiala',
+    'mysmis',
+    'total_chelt_eligibile_neramb',
+    'total_chelt_eligibile_aport',
+]
+DEVIZ_TEXT_COLUMNS = {'chapter', 'subchapter', 'name', 'tip_cheltuiala', 'mysmis'}
+
+# Coloanele foii «Capitole» din exportul XLSX
+CHAPTER_HEADERS = [
+    'chapter',
+    'subchapter',
+    'line_count',
+    'total_eligibil',
+    'total_neeligibil',
+    'total_tva',
+    'total',
+]
+
+# Numărul de linii citite dintr-o pagină search_read la exportul în flux
+EXPORT_BATCH_SIZE = 2000
+
+
+def _s(val):
+    """Convertește orice valoare dintr-o celulă în string "curat"."""
+    if val is None:
+        return ''
+    if isinstance(val, (int, float)):
+        text = str(val)
+        # opțional: dacă e 1.0, îl facem "1"
+        if text.endswith('.0'):
+            text = text[:-2]
+        return text.strip()
+    return str(val).strip()
+
+
+def _f(val):
+    """Convertește o celulă în float; acceptă atât 1234.56 cât și 1234,56."""
+    if val is None:
+        return 0.0
+    if isinstance(val, (int, float)):
+        return float(val)
+    val = str(val).strip()
+    if not val:
+        return 0.0
+    return float(val.replace(',', '.'))
+
+
+def _import_numpy():
+    """NumPy este opțional: accelerează verificarea fișierelor mari, dacă este instalat."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _parse_numeric_column(values, numpy=None):
+    """Convertește o coloană întreagă în numere, dintr-o singură trecere.
+
+    Returnează (valori, indici_invalizi). Cu NumPy, coloana este normalizată
+    (spații, virgulă zecimală, celule goale) și convertită vectorial; doar dacă
+    conversia eșuează se caută celulele invalide element cu element.
+    Fără NumPy se întoarce o listă, convertită cu `_f`.
+    """
+    if numpy is None:
+        parsed, invalid = [], []
+        for idx, val in enumerate(values):
+            try:
+                parsed.append(_f(val))
+            except (TypeError, ValueError):
+                parsed.append(0.0)
+                invalid.append(idx)
+        return parsed, invalid
+
+    text = numpy.char.strip(numpy.array(['' if v is None else str(v) for v in values], dtype=str))
+    text = numpy.char.replace(text, ',', '.')
+    text[text == ''] = '0'
+    try:
+        return text.astype(float), []
+    except ValueError:
+        parsed = numpy.zeros(len(text))
+        invalid = []
+        for idx, val in enumerate(text):
+            try:
+                parsed[idx] = float(val)
+            except ValueError:
+                invalid.append(idx)
+        return parsed, invalid
+
+
+def _import_pyarrow():
+    """pyarrow este opțional; fără el, formatul Parquet/Arrow nu este disponibil."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValidationError(
+            "Pentru formatul Parquet / Arrow este necesar pachetul 'pyarrow' "
+            "instalat pe serverul Odoo.\n"
+            "Până atunci, folosiți exportul / importul XLSX sau CSV."
+        )
+    return pyarrow
+
+
+def _deviz_arrow_schema(pa, extra_text_columns=()):
+    """Schema Arrow cu aceleași coloane ca DEVIZ_HEADERS (text -> string, sume -> float64)."""
+    return pa.schema(
+        [(col, pa.string()) for col in extra_text_columns]
+        + [
+            (col, pa.string() if col in DEVIZ_TEXT_COLUMNS else pa.float64())
+            for col in DEVIZ_HEADERS
+        ]
+    )
+
+
+def _build_deviz_xlsx(rows):
+    """Construiește conținutul unui fișier XLSX de deviz din rânduri deja citite.
+
+    Funcția nu folosește ORM-ul, ca să poată rula într-un proces separat
+    (ProcessPoolExecutor) la exportul de portofoliu.
+    """
+    import xlsxwriter
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    sheet = workbook.add_worksheet('Deviz')
+    sheet.write_row(0, 0, DEVIZ_HEADERS)
+    for row, values in enumerate(rows, start=1):
+        sheet.write_row(row, 0, values)
+    workbook.close()
+    return output.getvalue()
+
+
+class ProjectDevizExportWizard(models.TransientModel):
+    _name = 'project.deviz.export.wizard'
+    _description = 'Export Deviz Proiect'
+
+    project_id = fields.Many2one(
+        'project.funding',
+        string="Proiect",
+        required=True,
+        readonly=True,
+    )
+    file_data = fields.Binary(string="Fișier", readonly=True)
+    file_name = fields.Char(string="Nume fișier", readonly=True)
+    export_mode = fields.Selection(
+        [
+            ('standard', 'Fișier în fereastră'),
+            ('stream', 'Descărcare directă (devize mari)'),
+        ],
+        string="Mod export",
+        default='standard',
+        required=True,
+        help="Descărcarea directă scrie fișierul rând cu rând, cu memorie constantă, "
+             "și îl trimite browserului fără a-l salva în baza de date.",
+    )
+    export_format = fields.Selection(
+        [
+            ('xlsx', 'Excel (.xlsx)'),
+            ('parquet', 'Parquet (.parquet), pe coloane'),
+        ],
+        string="Format",
+        default='xlsx',
+        required=True,
+        help="Parquet transferă devizul pe coloane (pyarrow), pentru sincronizări "
+             "rapide între instanțe și cu instrumentele de analiză.",
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            self.env.context.get('active_model') == 'project.funding'
+            and self.env.context.get('active_id')
+        ):
+            res['project_id'] = self.env.context['active_id']
+        return res
+
+    @api.model
+    def _import_xlsxwriter(self):
+        # import local, ca să nu blocăm modulul dacă lipsește librăria
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ValidationError(
+                "Pentru export în Excel (.xlsx) este necesar pachetul 'xlsxwriter' "
+                "instalat pe serverul Odoo.\n"
+                "Până atunci, putem adapta exportul pe CSV."
+            )
+        return xlsxwriter
+
+    @api.model
+    def _iter_deviz_pages(self, project):
+        """Produce liniile devizului în pagini ordonate (liste de dict-uri search_read).
+
+        Liniile sunt citite cu search_read în pagini de EXPORT_BATCH_SIZE,
+        iar cache-ul este golit după fiecare pagină, deci memoria nu crește
+        cu dimensiunea devizului.
+        """
+        BudgetLine = self.env['project.budget']
+        domain = [('project_id', '=', project.id)]
+        offset = 0
+        while True:
+            page = BudgetLine.search_read(
+                domain, DEVIZ_HEADERS,
+                order='chapter, subchapter, id',
+                offset=offset, limit=EXPORT_BATCH_SIZE,
+            )
+            if not page:
+                break
+            yield [
+                {
+                    col: rec[col] or ('' if col in DEVIZ_TEXT_COLUMNS else 0.0)
+                    for col in DEVIZ_HEADERS
+                }
+                for rec in page
+            ]
+            offset += len(page)
+            self.env.invalidate_all()
+
+    @api.model
+    def _iter_deviz_rows(self, project):
+        """Produce rândurile devizului ca liste, în ordinea DEVIZ_HEADERS."""
+        for page in self._iter_deviz_pages(project):
+            for rec in page:
+                yield [rec[col] for col in DEVIZ_HEADERS]
+
+    @api.model
+    def _write_deviz_parquet(self, project, output, writer=None):
+        """Scrie devizul în format Parquet, câte un record batch pe pagină citită.
+
+        Dacă se primește un `writer` deschis (export portofoliu), paginile sunt
+        adăugate în el, cu coloana suplimentară `project_cod`.
+        Returnează numărul de linii scrise.
+        """
+        pa = _import_pyarrow()
+        own_writer = writer is None
+        if own_writer:
+            writer = pa.parquet.ParquetWriter(output, _deviz_arrow_schema(pa))
+        extra = {} if own_writer else {'project_cod': project.cod or str(project.id)}
+
+        count = 0
+        try:
+            for page in self._iter_deviz_pages(project):
+                columns = {col: [value] * len(page) for col, value in extra.items()}
+                columns.update({col: [rec[col] for rec in page] for col in DEVIZ_HEADERS})
+                writer.write_batch(pa.record_batch(columns, schema=writer.schema))
+                count += len(page)
+        finally:
+            if own_writer:
+                writer.close()
+        return count
+
+    @api.model
+    def _write_deviz_xlsx(self, project, output):
+        """Scrie devizul în `output` (cale sau fișier) cu xlsxwriter în mod constant_memory.
+
+        Returnează numărul de linii scrise.
+        """
+        xlsxwriter = self._import_xlsxwriter()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        sheet = workbook.add_worksheet('Deviz')
+        sheet.write_row(0, 0, DEVIZ_HEADERS)
+
+        row = 0
+        for row, values in enumerate(self._iter_deviz_rows(project), start=1):
+            sheet.write_row(row, 0, values)
+
+        self._write_chapter_sheet(workbook, project)
+        workbook.close()
+        return row
+
+    def _write_chapter_sheet(self, workbook, project):
+        """Adaugă foaia «Capitole», citită direct din subtotalurile stocate (project.budget.rollup)."""
+        sheet = workbook.add_worksheet('Capitole')
+        sheet.write_row(0, 0, CHAPTER_HEADERS)
+        rollups = self.env['project.budget.rollup'].search_read(
+            [('project_id', '=', project.id)],
+            ['chapter', 'subchapter_prefix', 'line_count',
+             'total_eligibil', 'total_neeligibil', 'total_tva', 'total'],
+        )
+        for row, rec in enumerate(rollups, start=1):
+            sheet.write_row(row, 0, [
+                rec['chapter'] or '',
+                rec['subchapter_prefix'] or '',
+                rec['line_count'],
+                rec['total_eligibil'],
+                rec['total_neeligibil'],
+                rec['total_tva'],
+                rec['total'],
+            ])
+
+    def action_export(self):
+        """Exportă devizul proiectului în format XLSX (Excel)."""
+        self.ensure_one()
+
+        if self.export_mode == 'stream':
+            # fișierul este generat și trimis direct de controller
+            return {
+                'type': 'ir.actions.act_url',
+                'url': '/project_funding/deviz/export/%d?format=%s' % (self.project_id.id, self.export_format),
+                'target': 'self',
+            }
+
+        cod = self.project_id.cod or 'proiect'
+        if self.export_format == 'parquet':
+            output = BytesIO()
+            self._write_deviz_parquet(self.project_id, output)
+            self.file_name = f"deviz_{cod}.parquet"
+            self.file_data = base64.b64encode(output.getvalue())
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'project.deviz.export.wizard',
+                'view_mode': 'form',
+                'res_id': self.id,
+                'target': 'new',
+            }
+
+        xlsxwriter = self._import_xlsxwriter()
+
+        lines = self.project_id.budget_line_ids.sorted(
+            key=lambda l: (l.chapter or '', l.subchapter or '', l.id)
+        )
+        headers = DEVIZ_HEADERS
+
+        output = BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        sheet = workbook.add_worksheet('Deviz')
+
+        # Header
+        for col, field in enumerate(headers):
+            sheet.write(0, col, field)
+
+        # Linii
+        row = 1
+        for l in lines:
+            sheet.write(row, 0, l.chapter or '')
+            sheet.write(row, 1, l.subchapter or '')
+            sheet.write(row, 2, l.name or '')
+            sheet.write(row, 3, l.chelt_elig_baza or 0.0)
+            sheet.write(row, 4, l.chelt_elig_tva or 0.0)
+            sheet.write(row, 5, l.chelt_neelig_baza or 0.0)
+            sheet.write(row, 6, l.chelt_neelig_tva or 0.0)
+            sheet.write(row, 7, l.tip_cheltuiala or '')
+            sheet.write(row, 8, l.mysmis or '')
+            sheet.write(row, 9, l.total_chelt_eligibile_neramb or 0.0)
+            sheet.write(row, 10, l.total_chelt_eligibile_aport or 0.0)
+            row += 1
+
+        self._write_chapter_sheet(workbook, self.project_id)
+        workbook.close()
+        data = output.getvalue()
+        output.close()
+
+        self.file_name = f"deviz_{cod}.xlsx"
+        self.file_data = base64.b64encode(data)
+
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.deviz.export.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+
+class ProjectDevizPortfolioExportWizard(models.TransientModel):
+    _name = 'project.deviz.portfolio.export.wizard'
+    _description = 'Export Deviz Portofoliu'
+
+    project_ids = fields.Many2many(
+        'project.funding',
+        string="Proiecte",
+        help="Proiectele selectate. Dacă lista este goală, se folosește domeniul de mai jos.",
+    )
+    project_domain = fields.Char(
+        string="Domeniu proiecte",
+        default="[]",
+    )
+    output_type = fields.Selection(
+        [
+            ('workbook', 'Un singur fișier XLSX (o foaie per proiect)'),
+            ('zip', 'Arhivă ZIP (un fișier XLSX per proiect)'),
+            ('parquet', 'Un singur fișier Parquet (coloana project_cod)'),
+        ],
+        string="Tip rezultat",
+        default='zip',
+        required=True,
+    )
+    max_workers = fields.Integer(
+        string="Procese paralele",
+        default=lambda self: min(4, os.cpu_count() or 1),
+        help="Numărul de procese folosite pentru generarea fișierelor per proiect (arhivă ZIP).",
+    )
+    file_data = fields.Binary(string="Fișier", readonly=True)
+    file_name = fields.Char(string="Nume fișier", readonly=True)
+    report = fields.Text(string="Raport export", readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            self.env.context.get('active_model') == 'project.funding'
+            and self.env.context.get('active_ids')
+        ):
+            res['project_ids'] = [(6, 0, self.env.context['active_ids'])]
+        return res
+
+    def _get_projects(self):
+        self.ensure_one()
+        if self.project_ids:
+            return self.project_ids
+        domain = safe_eval(self.project_domain or '[]')
+        return self.env['project.funding'].search(domain, order='cod, id')
+
+    @api.model
+    def _sheet_name(self, project, used):
+        """Nume de foaie Excel valid și unic (max. 31 caractere, fără []:*?/\\)."""
+        base = re.sub(r'[\[\]:*?/\\]', '_', project.cod or f"Proiect {project.id}")[:31]
+        name, idx = base, 1
+        while name.lower() in used:
+            suffix = f"~{idx}"
+            name = base[:31 - len(suffix)] + suffix
+            idx += 1
+        used.add(name.lower())
+        return name
+
+    @api.model
+    def _zip_entry_name(self, project, used):
+        """Nume de fișier sigur și unic în arhivă (fără directoare, fără «..»)."""
+        base = "deviz_%s" % (re.sub(r'[^\w\-]+', '_', project.cod or '').strip('_') or project.id)
+        name, idx = f"{base}.xlsx", 1
+        while name.lower() in used:
+            name = f"{base}~{idx}.xlsx"
+            idx += 1
+        used.add(name.lower())
+        return name
+
+    def _export_workbook(self, projects, output):
+        """O singură foaie per proiect, scrise succesiv în același registru (constant_memory)."""
+        ExportWizard = self.env['project.deviz.export.wizard']
+        xlsxwriter = ExportWizard._import_xlsxwriter()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        used, counts = set(), {}
+        for project in projects:
+            sheet = workbook.add_worksheet(self._sheet_name(project, used))
+            sheet.write_row(0, 0, DEVIZ_HEADERS)
+            row = 0
+            for row, values in enumerate(ExportWizard._iter_deviz_rows(project), start=1):
+                sheet.write_row(row, 0, values)
+            counts[project.id] = row
+        workbook.close()
+        return counts
+
+    def _export_parquet(self, projects, output):
+        """Toate devizele într-un singur fișier Parquet, cu coloana `project_cod`."""
+        ExportWizard = self.env['project.deviz.export.wizard']
+        pa = _import_pyarrow()
+        writer = pa.parquet.ParquetWriter(output, _deviz_arrow_schema(pa, ['project_cod']))
+        counts = {}
+        try:
+            for project in projects:
+                counts[project.id] = ExportWizard._write_deviz_parquet(project, output, writer=writer)
+        finally:
+            writer.close()
+        return counts
+
+    def _export_zip(self, projects, output):
+        """Un fișier XLSX per proiect; fișierele sunt generate în paralel, în procese separate.
+
+        Rândurile sunt citite din baza de date în procesul curent, iar
+        procesele din pool primesc doar date simple (fără ORM).
+        """
+        ExportWizard = self.env['project.deviz.export.wizard']
+        ExportWizard._import_xlsxwriter()
+        workers = max(1, self.max_workers or 1)
+        counts, used = {}, set()
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            def _store(project, content):
+                archive.writestr(self._zip_entry_name(project, used), content)
+
+            if workers == 1 or len(projects) == 1:
+                for project in projects:
+                    rows = list(ExportWizard._iter_deviz_rows(project))
+                    counts[project.id] = len(rows)
+                    _store(project, _build_deviz_xlsx(rows))
+                return counts
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = []
+                for project in projects:
+                    rows = list(ExportWizard._iter_deviz_rows(project))
+                    counts[project.id] = len(rows)
+                    pending.append((project, pool.submit(_build_deviz_xlsx, rows)))
+                    # limităm lucrările în așteptare, ca memoria să rămână mărginită
+                    while len(pending) >= 2 * workers:
+                        done_project, future = pending.pop(0)
+                        _store(done_project, future.result())
+                for done_project, future in pending:
+                    _store(done_project, future.result())
+        return counts
+
+    def action_export(self):
+        """Exportă devizele tuturor proiectelor selectate într-o singură operațiune."""
+        self.ensure_one()
+        projects = self._get_projects()
+        if not projects:
+            raise ValidationError("Nu există proiecte de exportat pentru selecția / domeniul indicat.")
+
+        started = time.perf_counter()
+        with tempfile.TemporaryFile() as output:
+            if self.output_type == 'workbook':
+                counts = self._export_workbook(projects, output)
+                extension = 'xlsx'
+            elif self.output_type == 'parquet':
+                counts = self._export_parquet(projects, output)
+                extension = 'parquet'
+            else:
+                counts = self._export_zip(projects, output)
+                extension = 'zip'
+            output.seek(0)
+            data = output.read()
+        elapsed = time.perf_counter() - started
+
+        report = [
+            "Proiecte exportate: %d" % len(projects),
+            "Linii de deviz: %d" % sum(counts.values()),
+            "Procese paralele: %d" % (max(1, self.max_workers or 1) if self.output_type == 'zip' else 1),
+            "Durată: %.2f s" % elapsed,
+            "",
+        ]
+        report += [
+            "%s: %d linii" % (project.cod or project.id, counts.get(project.id, 0))
+            for project in projects
+        ]
+        _logger.info(
+            "Export deviz portofoliu: %d proiecte, %d linii în %.2fs",
+            len(projects), sum(counts.values()), elapsed,
+        )
+
+        self.write({
+            'file_name': f"devize_portofoliu.{extension}",
+            'file_data': base64.b64encode(data),
+            'report': "\n".join(report),
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.deviz.portfolio.export.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+
+class ProjectDevizImportWizard(models.TransientModel):
+    _name = 'project.deviz.import.wizard'
+    _description = 'Import Deviz Proiect'
+
+    project_id = fields.Many2one(
+        'project.funding',
+        string="Proiect",
+        required=True,
+        readonly=True,
+    )
+    file_data = fields.Binary(string="Fișier (XLSX/CSV/Parquet)", required=True)
+    file_name = fields.Char(string="Nume fișier")
+    confirm_override = fields.Boolean(
+        string="Șterge liniile de deviz existente",
+        help="Bifează această opțiune pentru a șterge liniile de deviz existente înainte de import.",
+    )
+    import_mode = fields.Selection(
+        [
+            ('replace', 'Înlocuiește devizul'),
+            ('sync', 'Sincronizează după Nr. crt'),
+        ],
+        string="Mod import",
+        default='replace',
+        required=True,
+        help="Sincronizarea compară fișierul cu liniile existente după Nr. crt: "
+             "adaugă liniile noi și modifică doar câmpurile schimbate.",
+    )
+    delete_missing = fields.Boolean(
+        string="Șterge liniile care lipsesc din fișier",
+        help="La sincronizare, liniile existente al căror Nr. crt nu apare în fișier sunt șterse.",
+    )
+    validation_report = fields.Text(string="Raport verificare", readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            self.env.context.get('active_model') == 'project.funding'
+            and self.env.context.get('active_id')
+        ):
+            res['project_id'] = self.env.context['active_id']
+        return res
+
+    # ------------------------------
+    # Citire fișier (generator, memorie constantă)
+    # ------------------------------
+    @api.model
+    def _iter_file_rows(self, data, filename):
+        """Deschide fișierul și returnează (headers, iterator de rânduri).
+
+        Header-ul este citit și validat imediat (înainte de orice modificare
+        în baza de date); rândurile sunt produse unul câte unul, ca perechi
+        (număr rând în fișier, dict), fără a construi lista completă în memorie.
+        Numărul rândului include rândurile goale sărite; header-ul este rândul 1.
+        """
+        filename = (filename or "").lower()
+
+        # 1) XLSX (Excel modern)
+        if filename.endswith('.xlsx'):
+            headers, rows = self._iter_xlsx_rows(data)
+        # Parquet / Arrow (schimb pe coloane între instanțe)
+        elif filename.endswith(('.parquet', '.arrow', '.feather')):
+            headers, rows = self._iter_arrow_rows(data, filename)
+        # 2) XLS (Excel vechi)
+        elif filename.endswith('.xls'):
+            headers, rows = self._iter_xls_rows(data)
+        # 3) CSV (fallback)
+        else:
+            headers, rows = self._iter_csv_rows(data)
+
+        # Validăm coloanele obligatorii (toate cele lipsă, într-un singur mesaj)
+        header_set = set(headers)
+        missing = [col for col in IMPORT_REQUIRED_COLUMNS if col not in header_set]
+        if missing:
+            raise ValidationError(
+                f"Coloanele obligatorii {', '.join('«%s»' % col for col in missing)} lipsesc din fișier.\n"
+                f"Header așteptat: {', '.join(IMPORT_REQUIRED_COLUMNS)}."
+            )
+
+        return headers, rows
+
+    @api.model
+    def _iter_xlsx_rows(self, data):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValidationError(
+                "Pentru import din Excel (.xlsx) este necesar pachetul 'openpyxl' "
+                "instalat pe serverul Odoo.\n"
+                "Alternativ, salvați fișierul ca CSV (delimitat de punct și virgulă) și importați din nou."
+            )
+
+        # read_only: foaia este parcursă în flux, fără a încărca toate celulele
+        wb = openpyxl.load_workbook(BytesIO(data), read_only=True, data_only=True)
+        sheet_rows = wb.active.iter_rows(values_only=True)
+
+        header_row = next(sheet_rows, None) or ()
+        headers = [h or '' for h in header_row]
+        if not any(headers):
+            wb.close()
+            raise ValidationError("Fișier XLSX invalid sau fără header pe primul rând.")
+
+        def _rows():
+            try:
+                for row_no, row in enumerate(sheet_rows, start=2):
+                    if row is None or all(cell is None for cell in row):
+                        continue
+                    yield row_no, {
+                        headers[i]: (row[i] if i < len(row) and row[i] is not None else "")
+                        for i in range(len(headers))
+                    }
+            finally:
+                wb.close()
+
+        return headers, _rows()
+
+    @api.model
+    def _iter_xls_rows(self, data):
+        try:
+            import xlrd
+        except ImportError:
+            raise ValidationError(
+                "Pentru import din Excel (.xls) este necesar pachetul 'xlrd' "
+                "instalat pe serverul Odoo.\n"
+                "Alternativ, salvați fișierul ca XLSX sau CSV și importați din nou."
+            )
+
+        # on_demand: se încarcă doar prima foaie, nu tot registrul
+        wb = xlrd.open_workbook(file_contents=data, on_demand=True)
+        sh = wb.sheet_by_index(0)
+
+        headers = [str(h or '') for h in sh.row_values(0)] if sh.nrows else []
+        if not any(headers):
+            wb.release_resources()
+            raise ValidationError("Fișier XLS invalid sau fără header pe primul rând.")
+
+        def _rows():
+            try:
+                for rx in range(1, sh.nrows):
+                    row_vals = sh.row_values(rx)
+                    if not any(row_vals):
+                        continue
+                    yield rx + 1, {
+                        header: (row_vals[idx] if idx < len(row_vals) else "")
+                        for idx, header in enumerate(headers)
+                    }
+            finally:
+                wb.release_resources()
+
+        return headers, _rows()
+
+    @api.model
+    def _iter_arrow_rows(self, data, filename):
+        """Citește un fișier Parquet sau Arrow IPC câte un record batch o dată."""
+        pa = _import_pyarrow()
+        source = BytesIO(data)
+        try:
+            if filename.endswith('.parquet'):
+                parquet_file = pa.parquet.ParquetFile(source)
+                headers = list(parquet_file.schema_arrow.names)
+                batches = parquet_file.iter_batches(batch_size=IMPORT_BATCH_SIZE)
+            else:
+                reader = pa.ipc.open_file(source)
+                headers = list(reader.schema.names)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except (pa.ArrowInvalid, OSError):
+            raise ValidationError("Fișier Parquet / Arrow invalid.")
+
+        def _rows():
+            # fără rânduri goale; numerotare ca la celelalte formate (primul rând de date = 2)
+            row_no = 1
+            for batch in batches:
+                for row in batch.to_pylist():
+                    row_no += 1
+                    yield row_no, row
+
+        return headers, _rows()
+
+    @api.model
+    def _iter_csv_rows(self, data):
+        encoding_error = (
+            "Fișierul nu pare a fi CSV UTF-8.\n"
+            "Pentru import din Excel, folosiți XLSX sau CSV (UTF-8, delimitat de ';')."
+        )
+        # decodăm în flux direct din buffer, fără a crea tot textul în memorie
+        text = TextIOWrapper(BytesIO(data), encoding='utf-8-sig', newline='')
+        reader = csv.DictReader(text, delimiter=';')
+        try:
+            headers = reader.fieldnames
+        except UnicodeDecodeError:
+            raise ValidationError(encoding_error)
+        if not headers:
+            raise ValidationError("Fișier CSV invalid sau fără header pe primul rând.")
+
+        def _rows():
+            try:
+                # line_num: ultima linie fizică citită (DictReader sare peste liniile goale)
+                for row in reader:
+                    yield reader.line_num, row
+            except UnicodeDecodeError:
+                raise ValidationError(encoding_error)
+
+        return list(headers), _rows()
+
+    def _decoded_file(self):
+        if not self.file_data:
+            raise ValidationError("Încărcați un fișier pentru import.")
+        return base64.b64decode(self.file_data)
+
+    def _iter_rows_from_file(self):
+        """Citește fișierul încărcat în wizard: (headers, iterator de rânduri)."""
+        return self._iter_file_rows(self._decoded_file(), self.file_name)
+
+    # ------------------------------
+    # Conversie rând -> valori linie deviz
+    # ------------------------------
+    @api.model
+    def _prepare_budget_line_vals(self, project, row):
+        return {
+            'project_id': project.id,
+            'chapter': _s(row.get('chapter')),
+            'subchapter': _s(row.get('subchapter')),
+            'name': _s(row.get('name')),
+            'chelt_elig_baza': _f(row.get('chelt_elig_baza')),
+            'chelt_elig_tva': _f(row.get('chelt_elig_tva')),
+            'chelt_neelig_baza': _f(row.get('chelt_neelig_baza')),
+            'chelt_neelig_tva': _f(row.get('chelt_neelig_tva')),
+            'tip_cheltuiala': _s(row.get('tip_cheltuiala')),
+            'mysmis': _s(row.get('mysmis')),
+            'total_chelt_eligibile_neramb': _f(row.get('total_chelt_eligibile_neramb')),
+            'total_chelt_eligibile_aport': _f(row.get('total_chelt_eligibile_aport')),
+        }
+
+    @api.model
+    def _iter_budget_line_vals(self, project, rows, row_digests=None):
+        """Validează rândurile pe măsură ce sunt citite și produce valorile pentru create().
+
+        Rândurile cu un Nr. crt deja întâlnit în fișier nu sunt transmise mai departe;
+        toate dublurile sunt raportate într-un singur mesaj, după citirea fișierului
+        (eroarea anulează întreaga tranzacție de import).
+        Dacă se primește lista `row_digests`, se adaugă în ea amprenta fiecărui rând.
+        """
+        BudgetLine = self.env['project.budget']
+        seen = set()
+        duplicates = []
+        for _row_no, row in rows:
+            vals = self._prepare_budget_line_vals(project, row)
+            nr_crt = BudgetLine._make_nr_crt(vals['chapter'], vals['subchapter']) or ''
+            if nr_crt in seen:
+                duplicates.append((project.id, nr_crt))
+                continue
+            seen.add(nr_crt)
+            if row_digests is not None:
+                row_digests.append(self._row_digest(vals))
+            yield vals
+        if duplicates:
+            BudgetLine._raise_duplicate_nr_crt(duplicates)
+
+    def _create_budget_lines(self, vals_iter):
+        """Creează liniile de deviz în loturi de IMPORT_BATCH_SIZE; returnează numărul de linii."""
+        BudgetLine = self.env['project.budget']
+        count = 0
+        for batch in split_every(IMPORT_BATCH_SIZE, vals_iter, list):
+            BudgetLine.create(batch)
+            # scriem lotul în baza de date, ca totalurile proiectului
+            # să fie recalculate o singură dată pe lot, apoi golim cache-ul
+            self.env.flush_all()
+            self.env.invalidate_all()
+            count += len(batch)
+        return count
+
+    # ------------------------------
+    # Import incremental (sincronizare după Nr. crt)
+    # ------------------------------
+    @api.model
+    def _line_value_differs(self, field_name, old, new):
+        if field_name in DEVIZ_TEXT_COLUMNS:
+            return (old or '') != (new or '')
+        return float_compare(old or 0.0, new or 0.0, precision_digits=2) != 0
+
+    @api.model
+    def _diff_budget_lines(self, project, headers, rows, row_digests=None):
+        """Compară fișierul cu liniile existente, cheia fiind (project_id, nr_crt).
+
+        Nu scrie nimic în baza de date. Se compară doar coloanele prezente în fișier.
+        Liniile fără Nr. crt (capitol și subcapitol goale) se potrivesc în ordine:
+        rândul fără Nr. crt din fișier cu prima linie existentă fără Nr. crt.
+        Returnează un dict cu:
+          - to_create: valorile liniilor noi;
+          - to_write: {modificări: [id-uri]}, grupate pe seturi identice de modificări;
+          - changed: [(nr_crt, [(coloană, valoare veche, valoare nouă)])];
+          - missing: liniile existente (search_read) care lipsesc din fișier;
+          - unchanged: numărul de linii identice.
+        """
+        BudgetLine = self.env['project.budget']
+        compare_fields = [col for col in DEVIZ_HEADERS if col in set(headers)]
+
+        existing = {}
+        blank = []
+        for rec in BudgetLine.search_read(
+            [('project_id', '=', project.id)], ['nr_crt'] + compare_fields, order='id',
+        ):
+            if rec['nr_crt']:
+                existing[rec['nr_crt']] = rec
+            else:
+                blank.append(rec)
+
+        to_create = []
+        to_write = {}
+        changed = []
+        unchanged = 0
+        for vals in self._iter_budget_line_vals(project, rows, row_digests):
+            nr_crt = BudgetLine._make_nr_crt(vals['chapter'], vals['subchapter'])
+            if nr_crt:
+                old = existing.pop(nr_crt, None)
+            else:
+                old = blank.pop(0) if blank else None
+            if old is None:
+                to_create.append(vals)
+                continue
+            diffs = [
+                (col, old[col], vals[col])
+                for col in compare_fields
+                if self._line_value_differs(col, old[col], vals[col])
+            ]
+            if diffs:
+                changes = tuple((col, new) for col, _old, new in diffs)
+                to_write.setdefault(changes, []).append(old['id'])
+                changed.append((nr_crt or "(gol)", diffs))
+            else:
+                unchanged += 1
+
+        return {
+            'to_create': to_create,
+            'to_write': to_write,
+            'changed': changed,
+            'missing': list(existing.values()) + blank,
+            'unchanged': unchanged,
+        }
+
+    @api.model
+    def _sync_budget_lines(self, project, headers, rows, delete_missing=False, row_digests=None):
+        """Aplică fișierul peste liniile existente, cheia fiind (project_id, nr_crt).
+
+        - liniile noi sunt create în loturi;
+        - liniile existente primesc write() doar pentru câmpurile modificate
+          (grupate pe seturi identice de modificări);
+        - liniile care lipsesc din fișier sunt șterse doar dacă `delete_missing`.
+
+        Se compară doar coloanele prezente în fișier, deci valorile scrise de
+        «Repartizează aportul» rămân neatinse dacă fișierul nu le conține.
+        Returnează un dict cu numărul de linii adăugate / modificate / șterse / neschimbate.
+        """
+        BudgetLine = self.env['project.budget']
+        diff = self._diff_budget_lines(project, headers, rows, row_digests)
+
+        for changes, line_ids in diff['to_write'].items():
+            BudgetLine.browse(line_ids).write(dict(changes))
+
+        created = self._create_budget_lines(iter(diff['to_create']))
+
+        deleted = 0
+        if delete_missing and diff['missing']:
+            missing_ids = [rec['id'] for rec in diff['missing']]
+            BudgetLine.browse(missing_ids).unlink()
+            deleted = len(missing_ids)
+
+        return {
+            'created': created,
+            'updated': len(diff['changed']),
+            'deleted': deleted,
+            'unchanged': diff['unchanged'],
+        }
+
+    # ------------------------------
+    # Amprentă fișier: re-importul unui deviz neschimbat
+    # ------------------------------
+    @api.model
+    def _row_digest(self, vals):
+        values = [
+            vals[col] if col in DEVIZ_TEXT_COLUMNS else round(vals[col], 2)
+            for col in DEVIZ_HEADERS
+        ]
+        return hashlib.sha256(repr(values).encode()).digest()
+
+    def _fingerprint_scope(self):
+        # același fișier importat în alt mod poate da alt rezultat
+        return "%s:%s:" % (self.import_mode, self.import_mode == 'sync' and self.delete_missing)
+
+    def _file_fingerprint(self, data):
+        digest = hashlib.sha256(self._fingerprint_scope().encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _rows_fingerprint(self, headers, row_digests):
+        """Amprenta setului de rânduri (independentă de ordinea rândurilor și de formatul fișierului)."""
+        digest = hashlib.sha256(self._fingerprint_scope().encode())
+        digest.update(repr(sorted(col for col in headers if col in DEVIZ_HEADERS)).encode())
+        for row_digest in sorted(row_digests):
+            digest.update(row_digest)
+        return digest.hexdigest()
+
+    def _is_same_as_last_import(self, data, check_rows=True):
+        """Compară fișierul cu ultimul import: 'file' dacă fișierul este identic, 'rows'
+        dacă doar setul de rânduri este identic (alt format / altă ordine), altfel False.
+
+        Amprentele sunt șterse de orice modificare a liniilor de deviz
+        (vezi project.budget), deci o potrivire înseamnă că importul nu ar schimba nimic.
+        Comparația pe rânduri citește tot fișierul; importul o omite (`check_rows=False`),
+        fiindcă amprenta rândurilor se calculează oricum în trecerea de import.
+        Nu scrie nimic.
+        """
+        project = self.project_id
+        if not project.deviz_import_file_hash and not project.deviz_import_rows_hash:
+            return False
+
+        file_hash = self._file_fingerprint(data)
+        if project.deviz_import_file_hash == file_hash:
+            return 'file'
+
+        if check_rows and project.deviz_import_rows_hash:
+            headers, rows = self._iter_file_rows(data, self.file_name)
+            row_digests = []
+            for _vals in self._iter_budget_line_vals(project, rows, row_digests):
+                pass
+            if self._rows_fingerprint(headers, row_digests) == project.deviz_import_rows_hash:
+                return 'rows'
+        return False
+
+    def _action_unchanged(self):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Import deviz',
+                'message': (
+                    "Fișierul este identic cu ultimul import al acestui proiect.\n"
+                    "Devizul nu a fost modificat."
+                ),
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    def action_preview_changes(self):
+        """Arată ce linii ar fi adăugate / modificate / șterse, fără a scrie nimic."""
+        self.ensure_one()
+        data = self._decoded_file()
+        if self._is_same_as_last_import(data):
+            report = ["Fișierul este identic cu ultimul import. Nu există diferențe."]
+        else:
+            headers, rows = self._iter_file_rows(data, self.file_name)
+            diff = self._diff_budget_lines(self.project_id, headers, rows)
+            deletes = self.import_mode == 'replace' or self.delete_missing
+
+            report = [
+                "Linii noi: %d. Linii modificate: %d. Linii neschimbate: %d. "
+                "Linii care lipsesc din fișier: %d%s."
+                % (
+                    len(diff['to_create']), len(diff['changed']), diff['unchanged'],
+                    len(diff['missing']), " (vor fi șterse)" if deletes else "",
+                ),
+                "",
+            ]
+            report += [
+                "+ %s %s" % (
+                    self.env['project.budget']._make_nr_crt(vals['chapter'], vals['subchapter']) or "(gol)",
+                    vals['name'],
+                )
+                for vals in diff['to_create']
+            ]
+            for nr_crt, diffs in diff['changed']:
+                report.append("~ %s: %s" % (nr_crt, "; ".join(
+                    "%s: %s → %s" % (col, old if old is not False else '', new)
+                    for col, old, new in diffs
+                )))
+            report += [
+                "- %s %s" % (rec['nr_crt'] or "(gol)", rec.get('name') or '')
+                for rec in diff['missing']
+            ]
+
+        max_lines = 1000
+        if len(report) > max_lines:
+            report = report[:max_lines] + ["... și încă %d linii." % (len(report) - max_lines)]
+        self.validation_report = "\n".join(report)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.deviz.import.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+    # ------------------------------
+    # Verificare fișier fără import (dry-run)
+    # ------------------------------
+    @api.model
+    def _validate_rows(self, headers, rows):
+        """Verifică toate rândurile și coloanele dintr-o trecere, fără a scrie în baza de date.
+
+        Returnează (număr_rânduri, listă de (rând, mesaj)).
+        """
+        BudgetLine = self.env['project.budget']
+        header_set = set(headers)
+        text_cols = [col for col in DEVIZ_HEADERS if col in DEVIZ_TEXT_COLUMNS]
+        numeric_cols = [col for col in DEVIZ_HEADERS if col not in DEVIZ_TEXT_COLUMNS and col in header_set]
+
+        # citim fișierul o singură dată, pe coloane
+        columns = {col: [] for col in text_cols + numeric_cols}
+        row_numbers = []
+        for row_no, row in rows:
+            row_numbers.append(row_no)
+            for col in columns:
+                columns[col].append(row.get(col))
+        nb_rows = len(row_numbers)
+        errors = []
+
+        def _row_no(idx):
+            # numărul rândului din fișier (header-ul este rândul 1)
+            return row_numbers[idx]
+
+        # 1) Nr. crt unic în fișier (aceeași regulă ca la import)
+        first_seen = {}
+        for idx in range(nb_rows):
+            nr_crt = BudgetLine._make_nr_crt(
+                _s(columns['chapter'][idx]), _s(columns['subchapter'][idx]),
+            ) or ''
+            if nr_crt in first_seen:
+                errors.append((_row_no(idx), "Nr. crt «%s» este duplicat (apare și pe rândul %d)."
+                               % (nr_crt or "(gol)", _row_no(first_seen[nr_crt]))))
+            else:
+                first_seen[nr_crt] = idx
+
+        # 2) Valori de selecție
+        for col in ('tip_cheltuiala', 'mysmis'):
+            allowed = {key for key, _label in BudgetLine._fields[col].selection}
+            for idx, val in enumerate(columns[col]):
+                val = _s(val)
+                if val and val not in allowed:
+                    errors.append((_row_no(idx), "coloana «%s»: valoare necunoscută «%s»." % (col, val)))
+
+        # 3) Coloane numerice: conversie, valori negative
+        numpy = _import_numpy()
+        numbers = {}
+        for col in numeric_cols:
+            parsed, invalid = _parse_numeric_column(columns[col], numpy)
+            numbers[col] = parsed
+            for idx in invalid:
+                errors.append((_row_no(idx), "coloana «%s»: valoare numerică invalidă «%s»."
+                               % (col, columns[col][idx])))
+            if numpy is not None:
+                negative = numpy.flatnonzero(parsed < 0)
+            else:
+                negative = [idx for idx, val in enumerate(parsed) if val < 0]
+            for idx in negative:
+                errors.append((_row_no(idx), "coloana «%s»: valoare negativă (%.2f)." % (col, parsed[idx])))
+
+        # 4) Nerambursabil + aport trebuie să acopere exact totalul eligibil
+        split_cols = ('total_chelt_eligibile_neramb', 'total_chelt_eligibile_aport')
+        elig_cols = ('chelt_elig_baza', 'chelt_elig_tva')
+        if all(col in numbers for col in split_cols + elig_cols):
+            neramb, aport = numbers[split_cols[0]], numbers[split_cols[1]]
+            baza, tva = numbers[elig_cols[0]], numbers[elig_cols[1]]
+            if numpy is not None:
+                mismatch = numpy.flatnonzero(
+                    ((neramb != 0) | (aport != 0))
+                    & (numpy.abs(neramb + aport - baza - tva) > 0.005)
+                )
+            else:
+                mismatch = [
+                    idx for idx in range(nb_rows)
+                    if (neramb[idx] or aport[idx])
+                    and abs(neramb[idx] + aport[idx] - baza[idx] - tva[idx]) > 0.005
+                ]
+            for idx in mismatch:
+                errors.append((_row_no(idx), "nerambursabil + aport (%.2f) diferă de totalul eligibil (%.2f)."
+                               % (neramb[idx] + aport[idx], baza[idx] + tva[idx])))
+
+        errors.sort(key=lambda err: err[0])
+        return nb_rows, errors
+
+    def action_dry_run(self):
+        """Verifică fișierul și afișează toate erorile găsite, fără a modifica devizul."""
+        self.ensure_one()
+        started = time.perf_counter()
+        try:
+            headers, rows = self._iter_rows_from_file()
+            nb_rows, errors = self._validate_rows(headers, rows)
+        except ValidationError as e:
+            nb_rows, errors = 0, [(1, str(e))]
+
+        max_lines = 1000
+        report = [
+            "Rânduri citite: %d. Erori găsite: %d. Durată verificare: %.2f s."
+            % (nb_rows, len(errors), time.perf_counter() - started),
+            "(Rândurile sunt numerotate ca în fișier; header-ul este rândul 1.)",
+            "",
+        ]
+        report += ["Rândul %d: %s" % err for err in errors[:max_lines]]
+        if len(errors) > max_lines:
+            report.append("... și încă %d erori." % (len(errors) - max_lines))
+        if not errors:
+            report.append("Fișierul este valid și poate fi importat.")
+
+        self.validation_report = "\n".join(report)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.deviz.import.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+    def _check_override(self):
+        if (
+            self.import_mode == 'replace'
+            and self.project_id.budget_line_ids
+            and not self.confirm_override
+        ):
+            raise ValidationError(
+                "Proiectul are deja linii de deviz.\n"
+                "Bifează opțiunea «Șterge liniile de deviz existente» pentru a continua importul."
+            )
+
+    def action_enqueue_import(self):
+        """Trimite importul într-un job procesat în fundal (ir.cron), în loturi confirmate."""
+        self.ensure_one()
+        self._check_override()
+        if not self.file_data:
+            raise ValidationError("Încărcați un fișier pentru import.")
+
+        # validăm header-ul înainte de a crea jobul
+        self._iter_rows_from_file()
+
+        job = self.env['project.deviz.import.job'].create({
+            'project_id': self.project_id.id,
+            'file_data': self.file_data,
+            'file_name': self.file_name,
+            'import_mode': self.import_mode,
+            'delete_missing': self.delete_missing,
+        })
+        self.env.ref('project_funding.ir_cron_project_deviz_import_job')._trigger()
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Import deviz',
+                'message': (
+                    "Importul a fost pus în coadă (job %s).\n"
+                    "Progresul poate fi urmărit în tab-ul Deviz al proiectului."
+                ) % job.id,
+                'type': 'info',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
+    @profiled('Import deviz')
+    def action_import(self):
+        self.ensure_one()
+        project = self.project_id
+
+        data = self._decoded_file()
+        # doar amprenta fișierului: un fișier modificat este citit o singură dată, la import
+        if self._is_same_as_last_import(data, check_rows=False):
+            return self._action_unchanged()
+
+        project._snapshot_deviz_before_import(self.file_name)
+
+        if self.import_mode == 'sync':
+            return self._action_import_sync(data)
+
+        self._check_override()
+
+        # header-ul și unicitatea Nr. crt sunt validate aici, înainte de ștergerea
+        # liniilor existente și de primul lot scris (o trecere care citește doar cheile)
+        headers, rows = self._iter_file_rows(data, self.file_name)
+        self.env['project.budget']._check_unique_nr_crt_pairs(project.id, (
+            (_s(row.get('chapter')), _s(row.get('subchapter'))) for _row_no, row in rows
+        ))
+        headers, rows = self._iter_file_rows(data, self.file_name)
+
+        # Ștergem liniile existente dacă e cazul
+        if project.budget_line_ids:
+            project.budget_line_ids.unlink()
+
+        # Rândurile trec direct din fișier prin validare în create() pe loturi;
+        # o eroare de validare anulează toată tranzacția (inclusiv ștergerea).
+        row_digests = []
+        self._create_budget_lines(self._iter_budget_line_vals(project, rows, row_digests))
+        self._store_fingerprints(data, headers, row_digests)
+
+        # Revenim pe proiect
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.funding',
+            'view_mode': 'form',
+            'res_id': project.id,
+            'target': 'current',
+        }
+
+    def _store_fingerprints(self, data, headers, row_digests):
+        # după scrierea liniilor (care resetează amprentele), salvăm amprentele noului import
+        self.env.flush_all()
+        self.project_id.write({
+            'deviz_import_file_hash': self._file_fingerprint(data),
+            'deviz_import_rows_hash': self._rows_fingerprint(headers, row_digests),
+        })
+
+    def _action_import_sync(self, data):
+        project = self.project_id
+        headers, rows = self._iter_file_rows(data, self.file_name)
+
+        started = time.perf_counter()
+        row_digests = []
+        stats = self._sync_budget_lines(project, headers, rows, self.delete_missing, row_digests)
+        self._store_fingerprints(data, headers, row_digests)
+        _logger.info(
+            "Sincronizare deviz proiect %s în %.2fs: %s",
+            project.cod or project.id, time.perf_counter() - started, stats,
+        )
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Import deviz',
+                'message': (
+                    "Sincronizarea devizului a fost realizată.\n"
+                    "Linii adăugate: %(created)d.\n"
+                    "Linii modificate: %(updated)d.\n"
+                    "Linii șterse: %(deleted)d.\n"
+                    "Linii neschimbate: %(unchanged)d."
+                ) % stats,
+                'type': 'success',
+                'sticky': False,
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'res_model': 'project.funding',
+                    'view_mode': 'form',
+                    'res_id': project.id,
+                    'target': 'current',
+                },
+            }
+        }
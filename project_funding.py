@@ -1,516 +1,1164 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
-
-
-class ProjectFunding(models.Model):
-    _name = 'project.funding'
-    _description = 'Proiect finantat'
-    _rec_name = 'cod'  # Folosește codul ca nume afișat
-
-    # ------------------------------
-    # Informații beneficiar / client
-    # ------------------------------
-    beneficiar = fields.Char(string="Beneficiar")
-    cui = fields.Char(string="CUI")
-
-    # ------------------------------
-    # Detalii proiect
-    # ------------------------------
-    denumire = fields.Char(string="Denumire proiect")
-    cod = fields.Char(
-        string="Cod proiect",  # SMIS / MySMIS / cod apel etc.
-        required=True,
-    )
-
-    data_depunere = fields.Date(string="Data depunerii")
-    data_semnare = fields.Date(string="Data semnării")
-    data_finalizare = fields.Date(string="Data finalizării")
-
-    curs_eur = fields.Float(string="Curs EUR")
-    tva_eligibila = fields.Selection(
-        [
-            ('da', 'Da'),
-            ('nu', 'Nu'),
-        ],
-        string="TVA eligibilă"
-    )
-
-    # ------------------------------
-    # Indicatori financiari și fizici
-    # ------------------------------
-    aport_valoare = fields.Float(
-        string="Valoare aport (lei)",
-        help="Valoarea aportului beneficiarului în lei."
-    )
-
-    stadiu_financiar = fields.Float(
-        string="Stadiu financiar (%)",
-        help="Procentul de realizare financiară a proiectului (0-100)."
-    )
-
-    stadiu_fizic = fields.Float(
-        string="Stadiu fizic (%)",
-        help="Procentul de realizare fizică a proiectului (0-100), introdus manual."
-    )
-
-    data_monitorizare = fields.Date(
-        string="Data monitorizare",
-        help="Data finală a perioadei de monitorizare a proiectului."
-    )
-
-    status_proiect = fields.Selection(
-        [
-            ('in_lucru', 'In lucru'),
-            ('contractat', 'Contractat'),
-            ('monitorizare', 'Monitorizare'),
-            ('inchis', 'Inchis'),
-        ],
-        string="Status proiect",
-        default='in_lucru',
-        help="Stadiul general al proiectului."
-    )
-
-    # ------------------------------
-    # Devize (tab DEVIZ)
-    # ------------------------------
-    budget_line_ids = fields.One2many(
-        'project.budget',
-        'project_id',
-        string="Linii deviz"
-    )
-
-    deviz_note = fields.Text(string="Note deviz")
-
-    total_deviz_eligibil = fields.Float(
-        string="Total deviz eligibil",
-        compute="_compute_totals_deviz",
-        store=True
-    )
-    total_deviz_neeligibil = fields.Float(
-        string="Total deviz neeligibil",
-        compute="_compute_totals_deviz",
-        store=True
-    )
-    total_deviz_general = fields.Float(
-        string="Total deviz general",
-        compute="_compute_totals_deviz",
-        store=True
-    )
-
-    @api.depends('budget_line_ids.total_eligibil', 'budget_line_ids.total_neeligibil')
-    def _compute_totals_deviz(self):
-        for project in self:
-            elig = sum(project.budget_line_ids.mapped('total_eligibil'))
-            neelig = sum(project.budget_line_ids.mapped('total_neeligibil'))
-            project.total_deviz_eligibil = elig
-            project.total_deviz_neeligibil = neelig
-            project.total_deviz_general = elig + neelig
-
-    # ------------------------------
-    # Activități proiect
-    # ------------------------------
-    activity_ids = fields.One2many(
-        'project.activity', 'project_id', string="Activități"
-    )
-
-    # ------------------------------
-    # Achizitii proiect
-    # ------------------------------
-    acquisition_ids = fields.One2many(
-        'project.acquisition', 'project_id', string="Achiziții"
-    )
-
-    def action_open_acquisitions(self):
-        """Deschide lista de achiziții filtrată pe proiectul curent."""
-        self.ensure_one()
-        return {
-            "type": "ir.actions.act_window",
-            "name": "Achiziții proiect",
-            "res_model": "project_acquisition",
-            "view_mode": "list,form",   # în 19.0 se folosește 'list' în loc de 'tree'
-            "domain": [("project_id", "=", self.id)],
-            "context": {
-                "default_project_id": self.id,
-            },
-            "target": "current",
-        }
-
-    # ------------------------------
-    # Alte tab-uri (note simple deocamdată)
-    # ------------------------------
-    achizitii_note = fields.Text(string="Note achiziții")
-    activitati_note = fields.Text(string="Note activități")
-    rambursare_note = fields.Text(string="Note grafic rambursare")
-
-    # ------------------------------
-    # Afișarea numelui în Odoo (breadcrumb, many2one, titlu)
-    # ------------------------------
-    def name_get(self):
-        return [(rec.id, rec.cod or f"Proiect {rec.id}") for rec in self]
-
-    @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        """Permite căutarea directă după cod, beneficiar sau denumire proiect în many2one."""
-        args = args or []
-        domain = []
-        if name:
-            domain = ['|', '|',
-                      ('cod', operator, name),
-                      ('beneficiar', operator, name),
-                      ('denumire', operator, name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
-
-    # ------------------------------
-    # Repartizare aport pe linii de deviz
-    # ------------------------------
-    def action_distribute_aport(self):
-        """
-        Distribuie valoarea aportului proporțional cu totalul eligibil al devizului.
-
-        - Dacă totalul eligibil = 0 -> NU modifică nimic, afișează mesaj și abandonează.
-        - Dacă aport <= 0 -> NU modifică nimic, afișează mesaj și abandonează.
-        - Dacă aport > total eligibil -> eroare (ValidationError), fără modificări.
-        - Altfel:
-            * coef = aport / total_elig
-            * total_chelt_eligibile_aport  = total_eligibil_linie * coef (rotunjit la 2 zecimale)
-            * total_chelt_eligibile_neramb = total_eligibil_linie - aport_linie (rotunjit la 2 zecimale)
-
-        La final afișează un mesaj cu valoarea aportului și procentul aportului (4 zecimale).
-        """
-        self.ensure_one()
-        project = self
-
-        total_elig = project.total_deviz_eligibil or 0.0
-        aport = project.aport_valoare or 0.0
-
-        # 1) Total eligibil = 0 -> nu facem nimic, doar mesaj
-        if total_elig == 0:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Repartizare aport',
-                    'message': (
-                        "Totalul cheltuielilor eligibile este 0.\n"
-                        "Nu se poate calcula procentul de aport.\n"
-                        "Operațiunea a fost anulată, câmpurile nu au fost actualizate."
-                    ),
-                    'type': 'warning',
-                    'sticky': False,
-                }
-            }
-
-        # 2) Aport 0 sau negativ -> nu are sens să distribuim
-        if aport <= 0:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Repartizare aport',
-                    'message': (
-                        "Valoarea aportului este 0 sau negativă.\n"
-                        "Introduceți o valoare de aport mai mare decât 0 pentru a o putea repartiza."
-                    ),
-                    'type': 'warning',
-                    'sticky': False,
-                }
-            }
-
-        # 3) Aport mai mare decât totalul eligibil -> nu permitem (mai sigur)
-        if aport > total_elig:
-            raise ValidationError(
-                "Valoarea aportului (%.2f) nu poate depăși totalul cheltuielilor eligibile (%.2f)."
-                % (aport, total_elig)
-            )
-
-        # 4) Calcul procent aport
-        coef = aport / total_elig
-        coef_display = round(coef, 4)
-
-        # 5) Repartizăm pe linii
-        for line in project.budget_line_ids:
-            # recalculăm eligibilul direct din baza + TVA, ca să fim siguri
-            elig_line = (line.chelt_elig_baza or 0.0) + (line.chelt_elig_tva or 0.0)
-
-            aport_line = round(elig_line * coef, 2)
-            neramb_line = round(elig_line - aport_line, 2)
-
-            line.write({
-                'total_chelt_eligibile_aport': aport_line,
-                'total_chelt_eligibile_neramb': neramb_line,
-            })
-
-        # 6) Mesaj informativ către utilizator (non-blocant, fără rollback)
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': 'Repartizare aport',
-                'message': (
-                    "Repartizarea aportului a fost realizată.\n"
-                    "Valoare aport: %.2f lei.\n"
-                    "Total cheltuieli eligibile: %.2f lei.\n"
-                    "Procent aport la cheltuieli eligibile: %.4f."
-                ) % (aport, total_elig, coef_display),
-                'type': 'success',
-                'sticky': False,
-            }
-        }
-
-    # ------------------------------
-    # Generare automată ACTIVITĂȚI din șabloane
-    # ------------------------------
-    def _generate_activities_from_templates(self):
-        """Generează activități pentru proiect pe baza șabloanelor definite.
-
-        - Creează câte o activitate pentru fiecare șablon, păstrând sequence/phase/code/name.
-        - Copiază regulile de planificare (sursă dată proiect/altă activitate).
-        - În a doua trecere leagă activitățile între ele conform referințelor dintre șabloane.
-        """
-        Activity = self.env['project.activity']
-        Template = self.env['project.activity.template']
-
-        templates = Template.search([], order='sequence,id')
-        if not templates:
-            return
-
-        for project in self:
-            # dacă are deja activități, nu mai generăm (poți schimba logica dacă vrei)
-            if project.activity_ids:
-                continue
-
-            template_to_activity = {}
-
-            # 1) Creăm activitățile fără legături între ele
-            for tmpl in templates:
-                vals = {
-                    'project_id': project.id,
-                    'name': tmpl.name,
-                    'code': tmpl.code,
-                    'sequence': tmpl.sequence,
-                    'phase': tmpl.phase,
-
-                    'start_source_type': tmpl.start_source_type,
-                    'start_project_ref': tmpl.start_project_ref,
-                    'start_offset_days': tmpl.start_offset_days,
-                    'start_activity_ref_type': tmpl.start_activity_ref_type,
-
-                    'end_source_type': tmpl.end_source_type,
-                    'end_project_ref': tmpl.end_project_ref,
-                    'end_offset_days': tmpl.end_offset_days,
-                    'end_activity_ref_type': tmpl.end_activity_ref_type,
-                }
-                activity = Activity.create(vals)
-                template_to_activity[tmpl.id] = activity
-
-            # 2) A doua trecere: legăm activitățile între ele (start/end) conform șabloanelor
-            for tmpl in templates:
-                activity = template_to_activity[tmpl.id]
-                vals_update = {}
-
-                if tmpl.start_source_type == 'activity' and getattr(tmpl, 'start_template_id', False):
-                    ref_act = template_to_activity.get(tmpl.start_template_id.id)
-                    if ref_act:
-                        vals_update['start_activity_id'] = ref_act.id
-
-                if tmpl.end_source_type == 'activity' and getattr(tmpl, 'end_template_id', False):
-                    ref_act = template_to_activity.get(tmpl.end_template_id.id)
-                    if ref_act:
-                        vals_update['end_activity_id'] = ref_act.id
-
-                if vals_update:
-                    activity.write(vals_update)
-
-    @api.model
-    def create(self, vals):
-        """
-        La crearea unui proiect nou, generează automat activitățile din șabloane.
-        """
-        project = super(ProjectFunding, self).create(vals)
-        project._generate_activities_from_templates()
-        return project
-
-    def action_generate_activities_from_templates(self):
-        """
-        Buton manual pentru a genera activitățile din șabloane
-        pentru proiectele selectate care nu au încă activități.
-        """
-        self._generate_activities_from_templates()
-        return True
-
-    # -----------------------------
-    # Generare ACHIZIȚII din șabloane (legate de ACTIVITĂȚI)
-    # -----------------------------
-    def _generate_acquisitions_from_templates(self):
-        """
-        Generează achiziții pentru fiecare proiect, pe baza
-        șabloanelor din `project.acquisition.template`.
-
-        - Șabloanele se leagă de ȘABLOANE DE ACTIVITĂȚI
-          (start_template_id / end_template_id).
-        - Când generăm achizițiile reale, căutăm activitatea
-          corespunzătoare în `project.activity` (același cod / secvență / fază).
-        - Achizițiile rezultate au regulile de dată legate de ACTIVITĂȚI
-          (prin start_activity_id / end_activity_id), astfel încât
-          modificarea activităților actualizează automat datele achizițiilor.
-        """
-        Acquisition = self.env["project.acquisition"]
-        AcquisitionTemplate = self.env["project.acquisition.template"]
-
-        templates = AcquisitionTemplate.search([], order="sequence,id")
-        if not templates:
-            return
-
-        for project in self:
-            # Dacă vrei să regenerezi complet achizițiile pentru proiect:
-            if project.acquisition_ids:
-                project.acquisition_ids.unlink()
-
-            # helper: mapăm șablon de activitate -> activitate din proiect
-            def _find_activity_for_template(act_tmpl):
-                if not act_tmpl:
-                    return False
-
-                activities = project.activity_ids
-
-                # 1) încercăm întâi după cod (dacă există)
-                if act_tmpl.code:
-                    candidates = activities.filtered(
-                        lambda a: a.code == act_tmpl.code
-                    )
-                    if candidates:
-                        return candidates[0]
-
-                # 2) fallback: după sequence + phase
-                candidates = activities
-                if act_tmpl.sequence:
-                    candidates = candidates.filtered(
-                        lambda a: a.sequence == act_tmpl.sequence
-                    )
-                if act_tmpl.phase:
-                    candidates = candidates.filtered(
-                        lambda a: a.phase == act_tmpl.phase
-                    )
-                return candidates[0] if candidates else False
-
-            template_to_acq = {}
-
-            # PAS 1: creăm achizițiile pe baza șabloanelor
-            for tmpl in templates:
-                # --- început
-                start_source_type = "project"
-                start_project_ref = tmpl.start_project_ref
-                start_activity_id = False
-                start_activity_ref_type = "end"
-
-                if tmpl.start_source_type == "project":
-                    # legăm de data din proiect indicată de start_project_ref
-                    start_source_type = "project"
-                elif tmpl.start_source_type == "template":
-                    # legăm de o ACTIVITATE din proiect, corespunzătoare
-                    # șablonului de activitate
-                    act = _find_activity_for_template(tmpl.start_template_id)
-                    if act:
-                        start_source_type = "activity"
-                        start_activity_id = act.id
-                        start_activity_ref_type = tmpl.start_template_ref_type
-                    else:
-                        # dacă nu găsim activitatea, rămânem pe proiect
-                        start_source_type = "project"
-
-                # --- sfârșit
-                end_source_type = "project"
-                end_project_ref = tmpl.end_project_ref
-                end_activity_id = False
-                end_activity_ref_type = "end"
-
-                if tmpl.end_source_type == "project":
-                    end_source_type = "project"
-                elif tmpl.end_source_type == "template":
-                    act_end = _find_activity_for_template(tmpl.end_template_id)
-                    if act_end:
-                        end_source_type = "activity"
-                        end_activity_id = act_end.id
-                        end_activity_ref_type = tmpl.end_template_ref_type
-                    else:
-                        end_source_type = "project"
-
-                vals = {
-                    "project_id": project.id,
-                    "sequence": tmpl.sequence,
-                    "phase": tmpl.phase,
-                    "code": tmpl.code,
-                    "name": tmpl.name,
-                    "description": tmpl.description,
-                    "state": "draft",
-
-                    # reguli dată început (legate de ACTIVITĂȚI sau PROIECT)
-                    "start_source_type": start_source_type,
-                    "start_project_ref": start_project_ref,
-                    "start_activity_id": start_activity_id,
-                    "start_activity_ref_type": start_activity_ref_type,
-                    "start_offset_days": tmpl.start_offset_days,
-
-                    # reguli dată sfârșit
-                    "end_source_type": end_source_type,
-                    "end_project_ref": end_project_ref,
-                    "end_activity_id": end_activity_id,
-                    "end_activity_ref_type": end_activity_ref_type,
-                    "end_offset_days": tmpl.end_offset_days,
-                }
-
-                acq = Acquisition.create(vals)
-                template_to_acq[tmpl.id] = acq
-
-            # PAS 2: mapăm dependențele dintre șabloane pe achizițiile nou create
-            for tmpl in templates:
-                new_acq = template_to_acq.get(tmpl.id)
-                if not new_acq:
-                    continue
-
-                mapped_dep_ids = []
-                for dep_tmpl in tmpl.dependency_ids:
-                    mapped = template_to_acq.get(dep_tmpl.id)
-                    if mapped:
-                        mapped_dep_ids.append(mapped.id)
-
-                if mapped_dep_ids:
-                    new_acq.dependency_ids = [(6, 0, mapped_dep_ids)]
-
-    def action_generate_acquisitions_from_templates(self):
-        """Buton pe formularul de proiect: 'Generează achiziții din șablon'."""
-        for project in self:
-            project._generate_acquisitions_from_templates()
-        return True
-
-    # -----------------------------
-    # BUTON: Setare achiziții (doar pentru proiectul curent)
-    # -----------------------------
-    def action_open_acquisitions(self):
-        """Deschide lista de achiziții filtrată pe proiectul curent."""
-        self.ensure_one()
-        return {
-            "type": "ir.actions.act_window",
-            "name": "Achiziții proiect",
-            "res_model": "project.acquisition",
-            "view_mode": "list,form",
-            "domain": [("project_id", "=", self.id)],
-            "context": {
-                "default_project_id": self.id,
-            },
-            "target": "current",
-        }
-
-    # ------------------------------
-    # Integritate: nu permitem ștergerea proiectului cu copii
-    # ------------------------------
-    def unlink(self):
-        for project in self:
-            if project.budget_line_ids or project.activity_ids or project.acquisition_ids:
-                raise ValidationError(
-                    "Nu puteți șterge proiectul «%s» deoarece are linii de deviz, activități și/sau achiziții asociate.\n"
-                    "Ștergeți mai întâi înregistrările asociate dacă este cu adevărat necesar."
-                    % (project.cod or project.denumire or project.id)
-                )
-        return super(ProjectFunding, self).unlink()
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL, split_every
+from odoo.tools.lru import LRU
+import logging
+import time
+
+from .project_perf import profiled
+from .project_schedule import RULE_COLUMNS, compute_schedule, critical_path, rules_from_row
+
+_logger = logging.getLogger(__name__)
+
+# Numărul de linii actualizate printr-un singur UPDATE la repartizarea aportului
+APORT_UPDATE_CHUNK = 5000
+
+# Numărul de proiecte procesate într-o tranzacție la operațiunile pe portofoliu
+PROJECT_BATCH_CHUNK = 50
+
+# Numărul de proiecte scrise / verificate odată la operațiunile de închidere, arhivare, ștergere
+PROJECT_LIFECYCLE_CHUNK = 1000
+
+# Tabelele copil care blochează ștergerea unui proiect
+PROJECT_CHILD_TABLES = ['project_budget', 'project_activity', 'project_acquisition']
+
+# Datele proiectului de care depind calendarele activităților și achizițiilor
+SCHEDULE_DATE_FIELDS = {'data_depunere', 'data_semnare', 'data_finalizare'}
+
+# Numărul de activități / achiziții actualizate printr-un singur UPDATE la recalcularea calendarului
+SCHEDULE_UPDATE_CHUNK = 5000
+
+# Rezultatele analizei CPM, pe (bază de date, proiect); invalidate prin semnătura calendarului
+_CPM_CACHE = LRU(512)
+
+
+def _largest_remainder_split(total, weights):
+    """Împarte întregul `total` proporțional cu `weights` (întregi), fără pierderi la rotunjire.
+
+    Fiecare parte primește partea întreagă a cotei sale, iar unitățile rămase
+    se dau părților cu cele mai mari resturi (la egalitate, în ordinea listei).
+    Suma rezultatului este exact `total`.
+    """
+    weight_sum = sum(weights)
+    if not weight_sum:
+        return [0] * len(weights)
+    shares = []
+    remainders = []
+    for idx, weight in enumerate(weights):
+        share, remainder = divmod(weight * total, weight_sum)
+        shares.append(share)
+        remainders.append((-remainder, idx))
+    for _remainder, idx in sorted(remainders)[:total - sum(shares)]:
+        shares[idx] += 1
+    return shares
+
+
+class ProjectFunding(models.Model):
+    _name = 'project.funding'
+    _description = 'Proiect finantat'
+    _rec_name = 'cod'  # Folosește codul ca nume afișat
+
+    # ------------------------------
+    # Informații beneficiar / client
+    # ------------------------------
+    beneficiar = fields.Char(string="Beneficiar", index='trigram')
+    cui = fields.Char(string="CUI")
+
+    # ------------------------------
+    # Detalii proiect
+    # ------------------------------
+    denumire = fields.Char(string="Denumire proiect", index='trigram')
+    cod = fields.Char(
+        string="Cod proiect",  # SMIS / MySMIS / cod apel etc.
+        required=True,
+        index='trigram',
+    )
+
+    data_depunere = fields.Date(string="Data depunerii")
+    data_semnare = fields.Date(string="Data semnării")
+    data_finalizare = fields.Date(string="Data finalizării")
+
+    curs_eur = fields.Float(string="Curs EUR")
+    tva_eligibila = fields.Selection(
+        [
+            ('da', 'Da'),
+            ('nu', 'Nu'),
+        ],
+        string="TVA eligibilă"
+    )
+
+    # ------------------------------
+    # Indicatori financiari și fizici
+    # ------------------------------
+    aport_valoare = fields.Float(
+        string="Valoare aport (lei)",
+        help="Valoarea aportului beneficiarului în lei."
+    )
+
+    stadiu_financiar = fields.Float(
+        string="Stadiu financiar (%)",
+        help="Procentul de realizare financiară a proiectului (0-100)."
+    )
+
+    stadiu_fizic = fields.Float(
+        string="Stadiu fizic (%)",
+        help="Procentul de realizare fizică a proiectului (0-100), introdus manual."
+    )
+
+    data_monitorizare = fields.Date(
+        string="Data monitorizare",
+        help="Data finală a perioadei de monitorizare a proiectului."
+    )
+
+    status_proiect = fields.Selection(
+        [
+            ('in_lucru', 'In lucru'),
+            ('contractat', 'Contractat'),
+            ('monitorizare', 'Monitorizare'),
+            ('inchis', 'Inchis'),
+        ],
+        string="Status proiect",
+        default='in_lucru',
+        index=True,
+        help="Stadiul general al proiectului."
+    )
+
+    # Proiectele arhivate (de regulă cele închise) nu mai apar în căutările implicite
+    active = fields.Boolean(string="Activ", default=True, index=True)
+
+    # ------------------------------
+    # Devize (tab DEVIZ)
+    # ------------------------------
+    budget_line_ids = fields.One2many(
+        'project.budget',
+        'project_id',
+        string="Linii deviz"
+    )
+
+    deviz_note = fields.Text(string="Note deviz")
+
+    # Amprentele ultimului import de deviz (fișier / set de rânduri); sunt
+    # șterse la orice modificare a liniilor, ca re-importul să nu fie omis greșit.
+    deviz_import_file_hash = fields.Char(string="Amprentă fișier deviz", readonly=True, copy=False)
+    deviz_import_rows_hash = fields.Char(string="Amprentă rânduri deviz", readonly=True, copy=False)
+
+    def _reset_deviz_fingerprint(self):
+        stale = self.filtered(lambda p: p.deviz_import_file_hash or p.deviz_import_rows_hash)
+        if stale:
+            stale.write({'deviz_import_file_hash': False, 'deviz_import_rows_hash': False})
+
+    total_deviz_eligibil = fields.Float(
+        string="Total deviz eligibil",
+        compute="_compute_totals_deviz",
+        store=True
+    )
+    total_deviz_neeligibil = fields.Float(
+        string="Total deviz neeligibil",
+        compute="_compute_totals_deviz",
+        store=True
+    )
+    total_deviz_general = fields.Float(
+        string="Total deviz general",
+        compute="_compute_totals_deviz",
+        store=True
+    )
+
+    # Totaluri deviz în EUR, la cursul proiectului
+    total_deviz_eligibil_eur = fields.Float(
+        string="Total deviz eligibil (EUR)",
+        compute="_compute_totals_deviz_eur",
+        store=True
+    )
+    total_deviz_neeligibil_eur = fields.Float(
+        string="Total deviz neeligibil (EUR)",
+        compute="_compute_totals_deviz_eur",
+        store=True
+    )
+    total_deviz_general_eur = fields.Float(
+        string="Total deviz general (EUR)",
+        compute="_compute_totals_deviz_eur",
+        store=True
+    )
+
+    @api.depends('total_deviz_eligibil', 'total_deviz_neeligibil', 'curs_eur')
+    def _compute_totals_deviz_eur(self):
+        for project in self:
+            rate = project.curs_eur or 0.0
+            project.total_deviz_eligibil_eur = project.total_deviz_eligibil / rate if rate else 0.0
+            project.total_deviz_neeligibil_eur = project.total_deviz_neeligibil / rate if rate else 0.0
+            project.total_deviz_general_eur = project.total_deviz_general / rate if rate else 0.0
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'curs_eur' in vals:
+            self._recompute_budget_eur()
+        if SCHEDULE_DATE_FIELDS.intersection(vals):
+            self._recompute_schedule()
+        return res
+
+    def _recompute_budget_eur(self):
+        """Recalculează totalurile EUR ale liniilor de deviz printr-un UPDATE pe proiect.
+
+        Liniile nu depind de curs în ORM (o schimbare de curs ar marca pentru
+        recalculare fiecare linie în parte), așa că le actualizăm direct în SQL.
+        """
+        projects = self.filtered('id')
+        if not projects:
+            return
+        self.env['project.budget'].flush_model(['project_id', 'total_eligibil', 'total_neeligibil', 'total'])
+        projects.flush_recordset(['curs_eur'])
+        for project in projects:
+            self.env.cr.execute(
+                """
+                UPDATE project_budget
+                   SET total_eligibil_eur = CASE WHEN %(rate)s > 0 THEN total_eligibil / %(rate)s ELSE 0 END,
+                       total_neeligibil_eur = CASE WHEN %(rate)s > 0 THEN total_neeligibil / %(rate)s ELSE 0 END,
+                       total_eur = CASE WHEN %(rate)s > 0 THEN total / %(rate)s ELSE 0 END
+                 WHERE project_id = %(project_id)s
+                """,
+                {'rate': project.curs_eur or 0.0, 'project_id': project.id},
+            )
+        self.env['project.budget'].invalidate_model(
+            ['total_eligibil_eur', 'total_neeligibil_eur', 'total_eur']
+        )
+
+    # ------------------------------
+    # Calendar activități / achiziții
+    # ------------------------------
+    def _recompute_schedule(self):
+        """Recalculează datele activităților și achizițiilor într-o trecere pe proiect.
+
+        Regulile și datele curente se citesc din SQL, calendarul se calculează în
+        memorie (project_schedule) și doar datele schimbate se scriu înapoi, printr-un
+        UPDATE pe tabelă. Returnează {'project.activity': [...], 'project.acquisition': [...]},
+        cu tupluri (id, project_id, dată început veche, dată sfârșit veche, început nou, sfârșit nou).
+        """
+        changes = {'project.activity': [], 'project.acquisition': []}
+        projects = self.filtered('id')
+        if not projects:
+            return changes
+        self.env.flush_all()
+        cr = self.env.cr
+
+        cr.execute(
+            "SELECT id, data_depunere, data_semnare, data_finalizare FROM project_funding WHERE id IN %s",
+            [tuple(projects.ids)],
+        )
+        project_dates = {row['id']: row for row in cr.dictfetchall()}
+
+        rows = {}
+        for model in changes:
+            cr.execute(
+                "SELECT id, project_id, date_start, date_end, %s FROM %s WHERE project_id IN %%s"
+                % (", ".join(RULE_COLUMNS), self.env[model]._table),
+                [tuple(projects.ids)],
+            )
+            rows[model] = {}
+            for row in cr.dictfetchall():
+                rows[model].setdefault(row['project_id'], []).append(row)
+
+        for project_id, dates in project_dates.items():
+            activities = rows['project.activity'].get(project_id, [])
+            acquisitions = rows['project.acquisition'].get(project_id, [])
+            # referințe către activități din alte proiecte: se păstrează datele lor actuale
+            known = self._schedule_external_dates(activities + acquisitions, {row['id'] for row in activities})
+            new_activities, new_acquisitions = compute_schedule(
+                dates,
+                {row['id']: rules_from_row(row) for row in activities},
+                {row['id']: rules_from_row(row) for row in acquisitions},
+                known_dates=known,
+            )
+            for model, model_rows, new_dates in (
+                ('project.activity', activities, new_activities),
+                ('project.acquisition', acquisitions, new_acquisitions),
+            ):
+                for row in model_rows:
+                    date_start, date_end = new_dates[row['id']]
+                    if (row['date_start'] or False, row['date_end'] or False) != (date_start, date_end):
+                        changes[model].append((
+                            row['id'], project_id, row['date_start'] or False, row['date_end'] or False,
+                            date_start, date_end,
+                        ))
+
+        for model, model_changes in changes.items():
+            if not model_changes:
+                continue
+            for chunk in split_every(SCHEDULE_UPDATE_CHUNK, model_changes, list):
+                cr.execute(
+                    """
+                    UPDATE %s AS rec
+                       SET date_start = v.date_start,
+                           date_end = v.date_end,
+                           write_uid = %%s,
+                           write_date = (now() at time zone 'UTC')
+                      FROM unnest(%%s::int[], %%s::date[], %%s::date[]) AS v(id, date_start, date_end)
+                     WHERE rec.id = v.id
+                    """ % self.env[model]._table,
+                    [
+                        self.env.uid,
+                        [change[0] for change in chunk],
+                        [change[4] or None for change in chunk],
+                        [change[5] or None for change in chunk],
+                    ],
+                )
+            self.env[model].invalidate_model(['date_start', 'date_end', 'write_uid', 'write_date'])
+        return changes
+
+    @profiled('Recalculare calendar')
+    def action_recompute_schedule(self):
+        """Buton: recalculează calendarul proiectelor și raportează câte date s-au schimbat."""
+        changes = self._recompute_schedule()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Recalculare calendar',
+                'message': "Activități modificate: %d. Achiziții modificate: %d." % (
+                    len(changes['project.activity']), len(changes['project.acquisition']),
+                ),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
+
+    # ------------------------------
+    # Drum critic (CPM) peste activități și achiziții
+    # ------------------------------
+    def _schedule_signatures(self):
+        """Semnătura calendarului fiecărui proiect, pentru cache-ul CPM.
+
+        Este un hash peste fiecare activitate / achiziție (id, write_date, date) și peste
+        dependențele dintre achiziții, deci se schimbă la orice modificare confirmată,
+        chiar dacă o tranzacție mai veche confirmă după una mai nouă (write_date este
+        ora începerii tranzacției, deci max(write_date) nu ar fi suficient).
+        """
+        self.env.cr.execute(
+            """
+            SELECT p.id,
+                   p.write_date, p.data_finalizare,
+                   a.signature, q.signature, d.signature
+              FROM project_funding AS p
+         LEFT JOIN LATERAL (
+                   SELECT md5(string_agg(concat_ws(':', id, write_date, date_start, date_end), ','
+                                         ORDER BY id)) AS signature
+                     FROM project_activity WHERE project_id = p.id
+                   ) AS a ON TRUE
+         LEFT JOIN LATERAL (
+                   SELECT md5(string_agg(concat_ws(':', id, write_date, date_start, date_end), ','
+                                         ORDER BY id)) AS signature
+                     FROM project_acquisition WHERE project_id = p.id
+                   ) AS q ON TRUE
+         LEFT JOIN LATERAL (
+                   SELECT md5(string_agg(concat_ws(':', rel.acquisition_id, rel.dependency_id), ','
+                                         ORDER BY rel.acquisition_id, rel.dependency_id)) AS signature
+                     FROM project_acquisition_dependency_rel AS rel
+                     JOIN project_acquisition AS acq ON acq.id = rel.acquisition_id
+                    WHERE acq.project_id = p.id
+                   ) AS d ON TRUE
+             WHERE p.id IN %s
+            """,
+            [tuple(self.ids)],
+        )
+        return {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+    # câmpurile citite direct din SQL de analiza CPM (scrise în baza de date înainte de citire)
+    _CPM_FLUSH_FIELDS = {
+        'project.funding': ['data_finalizare', 'write_date'],
+        'project.activity': ['project_id', 'date_start', 'date_end', 'write_date'] + RULE_COLUMNS,
+        'project.acquisition': ['project_id', 'date_start', 'date_end', 'write_date', 'dependency_ids'] + RULE_COLUMNS,
+    }
+
+    def _cpm_analysis(self, store_cache=True):
+        """Analiza CPM pentru proiectele din self, din cache dacă semnătura nu s-a schimbat.
+
+        Cu `store_cache=False` rezultatele recalculate nu se adaugă în cache (parcurgeri
+        pe tot portofoliul, care altfel ar evacua intrările proiectelor folosite).
+
+        Returnează {project_id: {(model, id): (început timpuriu, sfârșit timpuriu,
+        început târziu, sfârșit târziu, rezervă zile, critic)}}.
+        """
+        projects = self.filtered('id')
+        if not projects:
+            return {}
+        # doar câmpurile citite mai jos, nu flush_all (metoda este apelată dintr-un compute)
+        for model, field_names in self._CPM_FLUSH_FIELDS.items():
+            self.env[model].flush_model(field_names)
+        dbname = self.env.cr.dbname
+        signatures = projects._schedule_signatures()
+
+        result, stale = {}, []
+        for project_id, signature in signatures.items():
+            cached = _CPM_CACHE.get((dbname, project_id))
+            if cached and cached[0] == signature:
+                result[project_id] = cached[1]
+            else:
+                stale.append(project_id)
+        if not stale:
+            return result
+
+        cr = self.env.cr
+        items = {project_id: {} for project_id in stale}
+        for model in ('project.activity', 'project.acquisition'):
+            cr.execute(
+                "SELECT id, project_id, date_start, date_end, %s FROM %s WHERE project_id IN %%s"
+                % (", ".join(RULE_COLUMNS), self.env[model]._table),
+                [tuple(stale)],
+            )
+            for row in cr.dictfetchall():
+                edges = [
+                    (('project.activity', row['%s_activity_id' % side]),
+                     row['%s_activity_ref_type' % side], side, row['%s_offset_days' % side])
+                    for side in ('start', 'end')
+                    if row['%s_source_type' % side] == 'activity' and row['%s_activity_id' % side]
+                ]
+                items[row['project_id']][(model, row['id'])] = {
+                    'start': row['date_start'], 'end': row['date_end'], 'edges': edges,
+                }
+
+        # dependențele între achiziții: de tip final -> început, fără decalaj
+        cr.execute(
+            """
+            SELECT rel.acquisition_id, rel.dependency_id, acq.project_id
+              FROM project_acquisition_dependency_rel AS rel
+              JOIN project_acquisition AS acq ON acq.id = rel.acquisition_id
+             WHERE acq.project_id IN %s
+            """,
+            [tuple(stale)],
+        )
+        for acq_id, dep_id, project_id in cr.fetchall():
+            item = items[project_id].get(('project.acquisition', acq_id))
+            if item:
+                item['edges'].append((('project.acquisition', dep_id), 'end', 'start', 0))
+
+        for project_id in stale:
+            analysis = critical_path(items[project_id], signatures[project_id][1])
+            if store_cache:
+                _CPM_CACHE[(dbname, project_id)] = (signatures[project_id], analysis)
+            result[project_id] = analysis
+        return result
+
+    def _schedule_external_dates(self, rows, local_ids):
+        """Datele (start, end) ale activităților referite care nu sunt în `local_ids`."""
+        external = {
+            row['%s_activity_id' % side]
+            for row in rows for side in ('start', 'end')
+            if row['%s_source_type' % side] == 'activity'
+            and row['%s_activity_id' % side]
+            and row['%s_activity_id' % side] not in local_ids
+        }
+        if not external:
+            return {}
+        self.env.cr.execute(
+            "SELECT id, date_start, date_end FROM project_activity WHERE id IN %s",
+            [tuple(external)],
+        )
+        return {
+            act_id: (date_start or False, date_end or False)
+            for act_id, date_start, date_end in self.env.cr.fetchall()
+        }
+
+    @api.depends('budget_line_ids.total_eligibil', 'budget_line_ids.total_neeligibil')
+    def _compute_totals_deviz(self):
+        """Totalurile devizului, calculate în PostgreSQL pentru tot recordset-ul.
+
+        Proiectele salvate folosesc o singură interogare SUM ... GROUP BY project_id,
+        fără a încărca liniile în cache. Proiectele nesalvate (formular în editare)
+        se calculează din liniile din memorie.
+        """
+        stored = self.filtered(lambda p: isinstance(p.id, int))
+        totals = {}
+        if stored:
+            for project, elig, neelig in self.env['project.budget']._read_group(
+                [('project_id', 'in', stored.ids)],
+                groupby=['project_id'],
+                aggregates=['total_eligibil:sum', 'total_neeligibil:sum'],
+            ):
+                totals[project.id] = (elig, neelig)
+
+        for project in self:
+            if project in stored:
+                elig, neelig = totals.get(project.id, (0.0, 0.0))
+            else:
+                elig = sum(project.budget_line_ids.mapped('total_eligibil'))
+                neelig = sum(project.budget_line_ids.mapped('total_neeligibil'))
+            project.total_deviz_eligibil = elig
+            project.total_deviz_neeligibil = neelig
+            project.total_deviz_general = elig + neelig
+
+    # ------------------------------
+    # Activități proiect
+    # ------------------------------
+    activity_ids = fields.One2many(
+        'project.activity', 'project_id', string="Activități"
+    )
+
+    # ------------------------------
+    # Achizitii proiect
+    # ------------------------------
+    acquisition_ids = fields.One2many(
+        'project.acquisition', 'project_id', string="Achiziții"
+    )
+
+    def action_open_acquisitions(self):
+        """Deschide lista de achiziții filtrată pe proiectul curent."""
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": "Achiziții proiect",
+            "res_model": "project_acquisition",
+            "view_mode": "list,form",   # în 19.0 se folosește 'list' în loc de 'tree'
+            "domain": [("project_id", "=", self.id)],
+            "context": {
+                "default_project_id": self.id,
+            },
+            "target": "current",
+        }
+
+    # ------------------------------
+    # Alte tab-uri (note simple deocamdată)
+    # ------------------------------
+    achizitii_note = fields.Text(string="Note achiziții")
+    activitati_note = fields.Text(string="Note activități")
+    rambursare_note = fields.Text(string="Note grafic rambursare")
+
+    # ------------------------------
+    # Afișarea numelui în Odoo (breadcrumb, many2one, titlu)
+    # ------------------------------
+    def name_get(self):
+        return [(rec.id, rec.cod or f"Proiect {rec.id}") for rec in self]
+
+    @api.model
+    def name_search(self, name='', args=None, operator='ilike', limit=100):
+        """Permite căutarea directă după cod, beneficiar sau denumire proiect în many2one."""
+        args = args or []
+        domain = []
+        if name:
+            domain = ['|', '|',
+                      ('cod', operator, name),
+                      ('beneficiar', operator, name),
+                      ('denumire', operator, name)]
+        if name and operator == 'ilike' and self.env.registry.has_trigram:
+            records = self._search_ranked(name, domain + args, limit)
+        else:
+            records = self.search(domain + args, limit=limit)
+        return records.name_get()
+
+    @api.model
+    def _search_ranked(self, name, domain, limit=100):
+        """Caută după `domain` și ordonează după asemănare (pg_trgm).
+
+        Codul identic cu textul căutat vine primul, apoi proiectele în ordinea
+        celei mai mari asemănări dintre cod, beneficiar și denumire. Filtrarea
+        (ilike) folosește indecșii trigram; regulile de acces se aplică prin _search.
+        """
+        query = self._search(domain)
+        self.env.cr.execute(SQL(
+            """
+            SELECT id
+              FROM project_funding
+             WHERE id IN %(ids)s
+          ORDER BY lower(cod) = lower(%(name)s) DESC,
+                   GREATEST(
+                       similarity(COALESCE(cod, ''), %(name)s),
+                       similarity(COALESCE(beneficiar, ''), %(name)s),
+                       similarity(COALESCE(denumire, ''), %(name)s)
+                   ) DESC,
+                   id
+             LIMIT %(limit)s
+            """,
+            ids=query.subselect(),
+            name=name,
+            limit=limit,
+        ))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    # ------------------------------
+    # Repartizare aport pe linii de deviz
+    # ------------------------------
+    @profiled('Repartizare aport')
+    def action_distribute_aport(self):
+        """
+        Distribuie valoarea aportului proporțional cu totalul eligibil al devizului.
+
+        - Dacă totalul eligibil = 0 -> NU modifică nimic, afișează mesaj și abandonează.
+        - Dacă aport <= 0 -> NU modifică nimic, afișează mesaj și abandonează.
+        - Dacă aport > total eligibil -> eroare (ValidationError), fără modificări.
+        - Altfel:
+            * coef = aport / total_elig
+            * total_chelt_eligibile_aport  = total_eligibil_linie * coef, rotunjit la ban
+              prin metoda celor mai mari resturi (suma pe linii = aportul, exact)
+            * total_chelt_eligibile_neramb = total_eligibil_linie - aport_linie
+
+        La final afișează un mesaj cu valoarea aportului și procentul aportului (4 zecimale).
+        """
+        self.ensure_one()
+        project = self
+
+        total_elig = project.total_deviz_eligibil or 0.0
+        aport = project.aport_valoare or 0.0
+        skip_reason = project._aport_skip_reason()
+
+        # 1) Total eligibil = 0 -> nu facem nimic, doar mesaj
+        if skip_reason == 'no_eligible':
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Repartizare aport',
+                    'message': (
+                        "Totalul cheltuielilor eligibile este 0.\n"
+                        "Nu se poate calcula procentul de aport.\n"
+                        "Operațiunea a fost anulată, câmpurile nu au fost actualizate."
+                    ),
+                    'type': 'warning',
+                    'sticky': False,
+                }
+            }
+
+        # 2) Aport 0 sau negativ -> nu are sens să distribuim
+        if skip_reason == 'no_aport':
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Repartizare aport',
+                    'message': (
+                        "Valoarea aportului este 0 sau negativă.\n"
+                        "Introduceți o valoare de aport mai mare decât 0 pentru a o putea repartiza."
+                    ),
+                    'type': 'warning',
+                    'sticky': False,
+                }
+            }
+
+        # 3) Aport mai mare decât totalul eligibil -> nu permitem (mai sigur)
+        if aport > total_elig:
+            raise ValidationError(
+                "Valoarea aportului (%.2f) nu poate depăși totalul cheltuielilor eligibile (%.2f)."
+                % (aport, total_elig)
+            )
+
+        # 4) Calcul procent aport
+        coef = aport / total_elig
+        coef_display = round(coef, 4)
+
+        # 5) Repartizăm pe linii (suma pe linii = aportul, exact la ban)
+        project._apply_aport_distribution(aport)
+
+        # 6) Mesaj informativ către utilizator (non-blocant, fără rollback)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Repartizare aport',
+                'message': (
+                    "Repartizarea aportului a fost realizată.\n"
+                    "Valoare aport: %.2f lei.\n"
+                    "Total cheltuieli eligibile: %.2f lei.\n"
+                    "Procent aport la cheltuieli eligibile: %.4f."
+                ) % (aport, total_elig, coef_display),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _aport_skip_reason(self):
+        """Motivul pentru care aportul nu se repartizează ('no_eligible' / 'no_aport') sau False."""
+        self.ensure_one()
+        if (self.total_deviz_eligibil or 0.0) == 0:
+            return 'no_eligible'
+        if (self.aport_valoare or 0.0) <= 0:
+            return 'no_aport'
+        return False
+
+    @profiled('Repartizare aport (portofoliu)')
+    def action_distribute_aport_batch(self):
+        """Repartizează aportul pe mai multe proiecte (selecție sau domeniu), în tranzacții pe loturi.
+
+        - proiectele cu total eligibil 0 sau fără aport sunt sărite, ca în varianta pe un proiect;
+        - un proiect cu eroare (ex. aport > total eligibil) nu oprește restul;
+        - după fiecare lot de PROJECT_BATCH_CHUNK proiecte se face commit.
+
+        Returnează o notificare cu numărul de proiecte actualizate / sărite / eșuate și durata.
+        """
+        projects = self
+        if not projects and self.env.context.get('active_domain') is not None:
+            projects = self.search(self.env.context['active_domain'])
+
+        started = time.perf_counter()
+        updated, skipped, failed = [], [], []
+        for chunk_ids in split_every(PROJECT_BATCH_CHUNK, projects.ids):
+            for project in self.browse(chunk_ids):
+                label = project.cod or project.id
+                try:
+                    with self.env.cr.savepoint():
+                        reason = project._aport_skip_reason()
+                        if reason:
+                            skipped.append(label)
+                            continue
+                        aport = project.aport_valoare
+                        if aport > project.total_deviz_eligibil:
+                            raise ValidationError(
+                                "Valoarea aportului (%.2f) depășește totalul eligibil (%.2f)."
+                                % (aport, project.total_deviz_eligibil)
+                            )
+                        project._apply_aport_distribution(aport)
+                        updated.append(label)
+                except Exception as e:
+                    self.env.invalidate_all()
+                    failed.append("%s: %s" % (label, e))
+            self.env.cr.commit()
+
+        elapsed = time.perf_counter() - started
+        _logger.info(
+            "Repartizare aport pe portofoliu: %d actualizate, %d sărite, %d eșuate în %.2fs",
+            len(updated), len(skipped), len(failed), elapsed,
+        )
+        message = (
+            "Proiecte actualizate: %d.\n"
+            "Proiecte sărite (total eligibil 0 sau fără aport): %d.\n"
+            "Proiecte eșuate: %d.\n"
+            "Durată: %.2f s."
+        ) % (len(updated), len(skipped), len(failed), elapsed)
+        if failed:
+            message += "\n\n" + "\n".join(failed[:20])
+            if len(failed) > 20:
+                message += "\n... și încă %d." % (len(failed) - 20)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Repartizare aport (portofoliu)',
+                'message': message,
+                'type': 'warning' if failed else 'success',
+                'sticky': bool(failed),
+            }
+        }
+
+    def _apply_aport_distribution(self, aport):
+        """Repartizează `aport` pe liniile devizului, proporțional cu eligibilul fiecărei linii.
+
+        Calculul se face în bani (numere întregi), cu metoda celor mai mari resturi,
+        astfel încât suma aportului pe linii să fie exact egală cu `aport`.
+        Rezultatul se scrie cu UPDATE-uri SQL pe loturi (nu câte un write() pe linie),
+        apoi cache-ul ORM pentru câmpurile modificate este invalidat.
+        """
+        self.ensure_one()
+        BudgetLine = self.env['project.budget']
+        BudgetLine.flush_model(['project_id', 'chelt_elig_baza', 'chelt_elig_tva'])
+        self.env.cr.execute(
+            """
+            SELECT id, COALESCE(chelt_elig_baza, 0) + COALESCE(chelt_elig_tva, 0)
+              FROM project_budget
+             WHERE project_id = %s
+          ORDER BY id
+            """,
+            [self.id],
+        )
+        lines = self.env.cr.fetchall()
+        elig_bani = [round(elig * 100) for _id, elig in lines]
+        aport_bani = _largest_remainder_split(round(aport * 100), elig_bani)
+
+        fnames = ['total_chelt_eligibile_aport', 'total_chelt_eligibile_neramb']
+        BudgetLine.flush_model(fnames)
+        for chunk in split_every(APORT_UPDATE_CHUNK, range(len(lines))):
+            self.env.cr.execute(
+                """
+                UPDATE project_budget AS line
+                   SET total_chelt_eligibile_aport = v.aport,
+                       total_chelt_eligibile_neramb = v.neramb,
+                       write_uid = %s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS v(id, aport, neramb)
+                 WHERE line.id = v.id
+                """,
+                [
+                    self.env.uid,
+                    [lines[i][0] for i in chunk],
+                    [aport_bani[i] / 100.0 for i in chunk],
+                    [(elig_bani[i] - aport_bani[i]) / 100.0 for i in chunk],
+                ],
+            )
+        BudgetLine.invalidate_model(fnames + ['write_uid', 'write_date'])
+        self._reset_deviz_fingerprint()
+
+    # ------------------------------
+    # Generare automată ACTIVITĂȚI din șabloane
+    # ------------------------------
+    @profiled('Generare activități din șabloane')
+    def _generate_activities_from_templates(self):
+        """Generează activități pentru proiecte pe baza șabloanelor definite.
+
+        - Șabloanele se citesc o singură dată, pentru toate proiectele din self.
+        - Activitățile tuturor proiectelor (fără activități) se creează într-un singur create.
+        - Legăturile dintre activități (start/end), conform referințelor dintre șabloane,
+          se scriu apoi printr-un singur UPDATE.
+        - Datele se calculează la final, o dată, cu _recompute_schedule.
+        """
+        Activity = self.env['project.activity']
+        Template = self.env['project.activity.template']
+
+        templates = Template.search([], order='sequence,id')
+        if not templates:
+            return
+
+        # dacă are deja activități, nu mai generăm (poți schimba logica dacă vrei)
+        with_activities = {
+            project.id
+            for [project] in Activity._read_group(
+                [('project_id', 'in', self.ids)], groupby=['project_id'],
+            )
+        }
+        projects = self.filtered(lambda p: p.id not in with_activities)
+        if not projects:
+            return
+
+        # 1) Creăm activitățile tuturor proiectelor fără legături între ele
+        template_vals = [
+            {
+                'name': tmpl.name,
+                'code': tmpl.code,
+                'sequence': tmpl.sequence,
+                'phase': tmpl.phase,
+
+                'start_source_type': tmpl.start_source_type,
+                'start_project_ref': tmpl.start_project_ref,
+                'start_offset_days': tmpl.start_offset_days,
+                'start_activity_ref_type': tmpl.start_activity_ref_type,
+
+                'end_source_type': tmpl.end_source_type,
+                'end_project_ref': tmpl.end_project_ref,
+                'end_offset_days': tmpl.end_offset_days,
+                'end_activity_ref_type': tmpl.end_activity_ref_type,
+            }
+            for tmpl in templates
+        ]
+        activities = Activity.create([
+            dict(vals, project_id=project.id)
+            for project in projects
+            for vals in template_vals
+        ])
+
+        # 2) Legăm activitățile între ele (start/end) conform șabloanelor, într-un singur UPDATE
+        template_index = {tmpl.id: index for index, tmpl in enumerate(templates)}
+        links = []
+        for offset in range(0, len(activities), len(templates)):
+            project_activities = activities[offset:offset + len(templates)]
+            for tmpl, activity in zip(templates, project_activities):
+                refs = []
+                for side in ('start', 'end'):
+                    ref_tmpl = tmpl['%s_template_id' % side]
+                    ref_act = False
+                    if tmpl['%s_source_type' % side] == 'activity' and ref_tmpl.id in template_index:
+                        ref_act = project_activities[template_index[ref_tmpl.id]].id
+                    refs.append(ref_act)
+                if any(refs):
+                    links.append((activity.id, *refs))
+
+        if links:
+            self.env.flush_all()
+            self.env.cr.execute(
+                """
+                UPDATE project_activity AS act
+                   SET start_activity_id = COALESCE(v.start_ref, act.start_activity_id),
+                       end_activity_id = COALESCE(v.end_ref, act.end_activity_id)
+                  FROM unnest(%s::int[], %s::int[], %s::int[]) AS v(id, start_ref, end_ref)
+                 WHERE act.id = v.id
+                """,
+                [
+                    [link[0] for link in links],
+                    [link[1] or None for link in links],
+                    [link[2] or None for link in links],
+                ],
+            )
+            Activity.invalidate_model(['start_activity_id', 'end_activity_id'])
+
+        # 3) Datele tuturor activităților, într-o singură trecere pe proiect
+        projects._recompute_schedule()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        La crearea proiectelor noi, generează automat activitățile din șabloane,
+        într-un singur pas pentru tot lotul (import CSV, create cu listă prin RPC).
+        """
+        projects = super(ProjectFunding, self).create(vals_list)
+        projects._generate_activities_from_templates()
+        return projects
+
+    def action_generate_activities_from_templates(self):
+        """
+        Buton manual pentru a genera activitățile din șabloane
+        pentru proiectele selectate care nu au încă activități.
+        """
+        self._generate_activities_from_templates()
+        return True
+
+    # -----------------------------
+    # Generare ACHIZIȚII din șabloane (legate de ACTIVITĂȚI)
+    # -----------------------------
+    @profiled('Generare achiziții din șabloane')
+    def _generate_acquisitions_from_templates(self):
+        """
+        Generează achiziții pentru fiecare proiect, pe baza
+        șabloanelor din `project.acquisition.template`.
+
+        - Șabloanele se leagă de ȘABLOANE DE ACTIVITĂȚI
+          (start_template_id / end_template_id).
+        - Când generăm achizițiile reale, căutăm activitatea
+          corespunzătoare în `project.activity` (același cod / secvență / fază).
+        - Achizițiile rezultate au regulile de dată legate de ACTIVITĂȚI
+          (prin start_activity_id / end_activity_id), astfel încât
+          modificarea activităților actualizează automat datele achizițiilor.
+        """
+        Acquisition = self.env["project.acquisition"]
+        AcquisitionTemplate = self.env["project.acquisition.template"]
+
+        templates = AcquisitionTemplate.search([], order="sequence,id")
+        if not templates:
+            return
+
+        for project in self:
+            # Dacă vrei să regenerezi complet achizițiile pentru proiect:
+            if project.acquisition_ids:
+                project.acquisition_ids.unlink()
+
+            # helper: mapăm șablon de activitate -> activitate din proiect
+            def _find_activity_for_template(act_tmpl):
+                if not act_tmpl:
+                    return False
+
+                activities = project.activity_ids
+
+                # 1) încercăm întâi după cod (dacă există)
+                if act_tmpl.code:
+                    candidates = activities.filtered(
+                        lambda a: a.code == act_tmpl.code
+                    )
+                    if candidates:
+                        return candidates[0]
+
+                # 2) fallback: după sequence + phase
+                candidates = activities
+                if act_tmpl.sequence:
+                    candidates = candidates.filtered(
+                        lambda a: a.sequence == act_tmpl.sequence
+                    )
+                if act_tmpl.phase:
+                    candidates = candidates.filtered(
+                        lambda a: a.phase == act_tmpl.phase
+                    )
+                return candidates[0] if candidates else False
+
+            template_to_acq = {}
+
+            # PAS 1: creăm achizițiile pe baza șabloanelor
+            for tmpl in templates:
+                # --- început
+                start_source_type = "project"
+                start_project_ref = tmpl.start_project_ref
+                start_activity_id = False
+                start_activity_ref_type = "end"
+
+                if tmpl.start_source_type == "project":
+                    # legăm de data din proiect indicată de start_project_ref
+                    start_source_type = "project"
+                elif tmpl.start_source_type == "template":
+                    # legăm de o ACTIVITATE din proiect, corespunzătoare
+                    # șablonului de activitate
+                    act = _find_activity_for_template(tmpl.start_template_id)
+                    if act:
+                        start_source_type = "activity"
+                        start_activity_id = act.id
+                        start_activity_ref_type = tmpl.start_template_ref_type
+                    else:
+                        # dacă nu găsim activitatea, rămânem pe proiect
+                        start_source_type = "project"
+
+                # --- sfârșit
+                end_source_type = "project"
+                end_project_ref = tmpl.end_project_ref
+                end_activity_id = False
+                end_activity_ref_type = "end"
+
+                if tmpl.end_source_type == "project":
+                    end_source_type = "project"
+                elif tmpl.end_source_type == "template":
+                    act_end = _find_activity_for_template(tmpl.end_template_id)
+                    if act_end:
+                        end_source_type = "activity"
+                        end_activity_id = act_end.id
+                        end_activity_ref_type = tmpl.end_template_ref_type
+                    else:
+                        end_source_type = "project"
+
+                vals = {
+                    "project_id": project.id,
+                    "sequence": tmpl.sequence,
+                    "phase": tmpl.phase,
+                    "code": tmpl.code,
+                    "name": tmpl.name,
+                    "description": tmpl.description,
+                    "state": "draft",
+
+                    # reguli dată început (legate de ACTIVITĂȚI sau PROIECT)
+                    "start_source_type": start_source_type,
+                    "start_project_ref": start_project_ref,
+                    "start_activity_id": start_activity_id,
+                    "start_activity_ref_type": start_activity_ref_type,
+                    "start_offset_days": tmpl.start_offset_days,
+
+                    # reguli dată sfârșit
+                    "end_source_type": end_source_type,
+                    "end_project_ref": end_project_ref,
+                    "end_activity_id": end_activity_id,
+                    "end_activity_ref_type": end_activity_ref_type,
+                    "end_offset_days": tmpl.end_offset_days,
+                }
+
+                acq = Acquisition.create(vals)
+                template_to_acq[tmpl.id] = acq
+
+            # PAS 2: mapăm dependențele dintre șabloane pe achizițiile nou create
+            for tmpl in templates:
+                new_acq = template_to_acq.get(tmpl.id)
+                if not new_acq:
+                    continue
+
+                mapped_dep_ids = []
+                for dep_tmpl in tmpl.dependency_ids:
+                    mapped = template_to_acq.get(dep_tmpl.id)
+                    if mapped:
+                        mapped_dep_ids.append(mapped.id)
+
+                if mapped_dep_ids:
+                    new_acq.dependency_ids = [(6, 0, mapped_dep_ids)]
+
+    def action_generate_acquisitions_from_templates(self):
+        """Buton pe formularul de proiect: 'Generează achiziții din șablon'."""
+        for project in self:
+            project._generate_acquisitions_from_templates()
+        return True
+
+    # -----------------------------
+    # BUTON: Setare achiziții (doar pentru proiectul curent)
+    # -----------------------------
+    def action_open_acquisitions(self):
+        """Deschide lista de achiziții filtrată pe proiectul curent."""
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": "Achiziții proiect",
+            "res_model": "project.acquisition",
+            "view_mode": "list,form",
+            "domain": [("project_id", "=", self.id)],
+            "context": {
+                "default_project_id": self.id,
+            },
+            "target": "current",
+        }
+
+    # ------------------------------
+    # Integritate: nu permitem ștergerea proiectului cu copii
+    # ------------------------------
+    def unlink(self):
+        blocked = self._with_children()
+        if blocked:
+            names = ", ".join(
+                "«%s»" % (project.cod or project.denumire or project.id) for project in blocked[:20]
+            )
+            if len(blocked) > 20:
+                names += " și încă %d" % (len(blocked) - 20)
+            raise ValidationError(
+                "Nu puteți șterge proiectele %s deoarece au linii de deviz, activități și/sau achiziții asociate.\n"
+                "Ștergeți mai întâi înregistrările asociate dacă este cu adevărat necesar."
+                % names
+            )
+        return super(ProjectFunding, self).unlink()
+
+    def _with_children(self):
+        """Proiectele din self care au linii de deviz, activități sau achiziții.
+
+        O interogare EXISTS pe tabelă copil și pe lot de PROJECT_LIFECYCLE_CHUNK proiecte,
+        fără a citi câmpurile one2many.
+        """
+        ids = [pid for pid in self.ids if isinstance(pid, int)]
+        if not ids:
+            return self.browse()
+        self.env.flush_all()
+        blocked = set()
+        for table in PROJECT_CHILD_TABLES:
+            for chunk_ids in split_every(PROJECT_LIFECYCLE_CHUNK, [pid for pid in ids if pid not in blocked], list):
+                self.env.cr.execute(SQL(
+                    """
+                    SELECT p.id
+                      FROM unnest(%s::int[]) AS p(id)
+                     WHERE EXISTS (SELECT 1 FROM %s AS child WHERE child.project_id = p.id)
+                    """,
+                    chunk_ids,
+                    SQL.identifier(table),
+                ))
+                blocked.update(row[0] for row in self.env.cr.fetchall())
+        return self.browse([pid for pid in ids if pid in blocked])
+
+    # ------------------------------
+    # Operațiuni pe portofoliu: închidere, arhivare, ștergere
+    # ------------------------------
+    def _lifecycle_targets(self, domain=None):
+        """Proiectele selectate sau, fără selecție, cele din active_domain (filtrate cu `domain`)."""
+        projects = self
+        if not projects and self.env.context.get('active_domain') is not None:
+            projects = self.search(self.env.context['active_domain'])
+        if domain:
+            projects = projects.filtered_domain(domain)
+        return projects
+
+    def _write_in_chunks(self, vals):
+        """Scrie `vals` pe loturi de PROJECT_LIFECYCLE_CHUNK proiecte, golind cache-ul după fiecare lot."""
+        for chunk_ids in split_every(PROJECT_LIFECYCLE_CHUNK, self.ids):
+            self.browse(chunk_ids).write(vals)
+            self.env.flush_all()
+            self.env.invalidate_all()
+
+    def _lifecycle_notification(self, title, message):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            }
+        }
+
+    def action_close_projects(self):
+        """Trece proiectele selectate în statusul «Inchis»."""
+        projects = self._lifecycle_targets([('status_proiect', '!=', 'inchis')])
+        projects._write_in_chunks({'status_proiect': 'inchis'})
+        return self._lifecycle_notification(
+            "Închidere proiecte", "Proiecte închise: %d." % len(projects)
+        )
+
+    def action_archive_closed_projects(self):
+        """Arhivează proiectele închise din selecție, ca să nu mai apară în listele uzuale."""
+        projects = self._lifecycle_targets([('status_proiect', '=', 'inchis'), ('active', '=', True)])
+        projects._write_in_chunks({'active': False})
+        return self._lifecycle_notification(
+            "Arhivare proiecte", "Proiecte închise arhivate: %d." % len(projects)
+        )
+
+    def action_delete_projects(self):
+        """Șterge proiectele fără înregistrări asociate; cele cu copii sunt doar raportate."""
+        projects = self._lifecycle_targets()
+        blocked = projects._with_children()
+        deletable = projects - blocked
+        for chunk_ids in split_every(PROJECT_LIFECYCLE_CHUNK, deletable.ids):
+            self.browse(chunk_ids).unlink()
+        message = "Proiecte șterse: %d." % len(deletable)
+        if blocked:
+            message += (
+                "\nProiecte păstrate (au linii de deviz, activități sau achiziții): %d."
+                % len(blocked)
+            )
+        return self._lifecycle_notification("Ștergere proiecte", message)
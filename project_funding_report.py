@@ -0,0 +1,106 @@
+from odoo import models, fields, tools
+
+
+class ProjectFundingReport(models.Model):
+    """Raport KPI portofoliu: un rând pe proiect, calculat integral în PostgreSQL.
+
+    Liniile de deviz, activitățile și achizițiile sunt agregate fiecare într-o
+    subinterogare separată (GROUP BY project_id) și abia apoi unite cu proiectul,
+    ca join-urile să nu multiplice rândurile între ele.
+    """
+    _name = 'project.funding.report'
+    _description = 'Raport KPI proiecte finanțate'
+    _auto = False
+    _rec_name = 'project_id'
+    _order = 'data_semnare desc, project_id'
+
+    project_id = fields.Many2one('project.funding', string="Proiect", readonly=True)
+    active = fields.Boolean(string="Activ", readonly=True)
+    beneficiar = fields.Char(string="Beneficiar", readonly=True)
+    status_proiect = fields.Selection(
+        [
+            ('in_lucru', 'In lucru'),
+            ('contractat', 'Contractat'),
+            ('monitorizare', 'Monitorizare'),
+            ('inchis', 'Inchis'),
+        ],
+        string="Status proiect",
+        readonly=True,
+    )
+    data_depunere = fields.Date(string="Data depunerii", readonly=True)
+    data_semnare = fields.Date(string="Data semnării", readonly=True)
+    data_finalizare = fields.Date(string="Data finalizării", readonly=True)
+
+    # ------------------------------
+    # Indicatori
+    # ------------------------------
+    nr_proiecte = fields.Integer(string="Nr. proiecte", readonly=True)
+    stadiu_financiar = fields.Float(string="Stadiu financiar (%)", aggregator='avg', readonly=True)
+    stadiu_fizic = fields.Float(string="Stadiu fizic (%)", aggregator='avg', readonly=True)
+    aport_valoare = fields.Float(string="Aport", readonly=True)
+
+    nr_linii_deviz = fields.Integer(string="Nr. linii deviz", readonly=True)
+    total_eligibil = fields.Float(string="Total eligibil", readonly=True)
+    total_neeligibil = fields.Float(string="Total neeligibil", readonly=True)
+    total_tva = fields.Float(string="Total TVA", readonly=True)
+    total_general = fields.Float(string="Total general", readonly=True)
+
+    nr_activitati = fields.Integer(string="Nr. activități", readonly=True)
+    nr_activitati_finalizate = fields.Integer(string="Activități finalizate", readonly=True)
+    nr_achizitii = fields.Integer(string="Nr. achiziții", readonly=True)
+    nr_achizitii_finalizate = fields.Integer(string="Achiziții finalizate", readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(
+            """
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT p.id AS id,
+                       p.id AS project_id,
+                       p.active AS active,
+                       p.beneficiar AS beneficiar,
+                       p.status_proiect AS status_proiect,
+                       p.data_depunere AS data_depunere,
+                       p.data_semnare AS data_semnare,
+                       p.data_finalizare AS data_finalizare,
+                       1 AS nr_proiecte,
+                       p.stadiu_financiar AS stadiu_financiar,
+                       p.stadiu_fizic AS stadiu_fizic,
+                       p.aport_valoare AS aport_valoare,
+                       COALESCE(b.nr_linii, 0) AS nr_linii_deviz,
+                       COALESCE(b.total_eligibil, 0) AS total_eligibil,
+                       COALESCE(b.total_neeligibil, 0) AS total_neeligibil,
+                       COALESCE(b.total_tva, 0) AS total_tva,
+                       COALESCE(b.total_general, 0) AS total_general,
+                       COALESCE(a.nr_total, 0) AS nr_activitati,
+                       COALESCE(a.nr_finalizate, 0) AS nr_activitati_finalizate,
+                       COALESCE(q.nr_total, 0) AS nr_achizitii,
+                       COALESCE(q.nr_finalizate, 0) AS nr_achizitii_finalizate
+                  FROM project_funding AS p
+             LEFT JOIN (
+                        SELECT project_id,
+                               count(*) AS nr_linii,
+                               sum(total_eligibil) AS total_eligibil,
+                               sum(total_neeligibil) AS total_neeligibil,
+                               sum(total_tva) AS total_tva,
+                               sum(total) AS total_general
+                          FROM project_budget
+                      GROUP BY project_id
+                       ) AS b ON b.project_id = p.id
+             LEFT JOIN (
+                        SELECT project_id,
+                               count(*) AS nr_total,
+                               count(*) FILTER (WHERE state = 'done') AS nr_finalizate
+                          FROM project_activity
+                      GROUP BY project_id
+                       ) AS a ON a.project_id = p.id
+             LEFT JOIN (
+                        SELECT project_id,
+                               count(*) AS nr_total,
+                               count(*) FILTER (WHERE state = 'done') AS nr_finalizate
+                          FROM project_acquisition
+                      GROUP BY project_id
+                       ) AS q ON q.project_id = p.id
+            )
+            """ % self._table
+        )
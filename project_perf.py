@@ -0,0 +1,153 @@
+from odoo import models, fields, api
+import functools
+import logging
+import time
+from datetime import timedelta
+
+_logger = logging.getLogger(__name__)
+
+# Parametrul de sistem care activează profilarea (ex. "1"); implicit dezactivată
+PROFILING_PARAM = 'project_funding.profiling'
+
+# Intrările din jurnal mai vechi de atâtea zile sunt șterse de autovacuum
+PERF_LOG_RETENTION_DAYS = 30
+
+
+def _pending_recomputes(env):
+    """Numărul de înregistrări care așteaptă recalcularea unui câmp stocat în tranzacție."""
+    return sum(len(ids) for field, ids in env.transaction.tocompute.items() if field.store)
+
+
+class _CallCounters:
+    """Contoare pentru un singur apel profilat.
+
+    Rândurile SQL se adună dintr-un cârlig pus doar pe cursorul apelului (atributul
+    `execute` al instanței), scos la final. Recalculările stocate se deduc din
+    scăderea listei de câmpuri în așteptare (env.transaction.tocompute), observată la
+    fiecare interogare și la flush-ul final.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.cr = env.cr
+        self.rows = 0
+        self.recomputes = 0
+        self.pending = _pending_recomputes(env)
+
+    def sample(self):
+        pending = _pending_recomputes(self.env)
+        if pending < self.pending:
+            self.recomputes += self.pending - pending
+        self.pending = pending
+
+    def __enter__(self):
+        cr = self.cr
+        self._previous = cr.__dict__.get('execute')
+        execute = cr.execute
+
+        @functools.wraps(execute)
+        def hooked(*args, **kwargs):
+            # recalculările se fac înaintea interogărilor care le scriu
+            self.sample()
+            res = execute(*args, **kwargs)
+            if cr.rowcount > 0:
+                self.rows += cr.rowcount
+            return res
+
+        cr.execute = hooked
+        return self
+
+    def __exit__(self, *exc):
+        if self._previous is None:
+            del self.cr.execute
+        else:
+            self.cr.execute = self._previous
+        return False
+
+
+def profiled(label=None):
+    """Decorator pentru metode de model: măsoară durata, interogările SQL, rândurile
+    citite / modificate și recalculările de câmpuri stocate ale apelului decorat,
+    apoi scrie o intrare în `project.perf.log`.
+
+    Profilarea este activă doar dacă parametrul de sistem PROFILING_PARAM este setat;
+    cârligele se pun doar pe cursorul apelului, cât timp durează acesta.
+    Se aplică direct pe funcție, sub eventualii decoratori @api:
+
+        @profiled('Import deviz')
+        def action_import(self): ...
+    """
+    def decorator(method):
+        name = label or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.env['ir.config_parameter'].sudo().get_param(PROFILING_PARAM):
+                return method(self, *args, **kwargs)
+
+            cr = self.env.cr
+            started = time.perf_counter()
+            queries = cr.sql_log_count
+            with _CallCounters(self.env) as counters:
+                res = method(self, *args, **kwargs)
+                # recalculările amânate până la flush fac parte din costul metodei
+                self.env.flush_all()
+                counters.sample()
+            duration = time.perf_counter() - started
+            query_count = cr.sql_log_count - queries
+
+            self.env['project.perf.log'].sudo()._record(
+                name=name,
+                model=self._name,
+                res_ids=self.ids,
+                duration=duration,
+                query_count=query_count,
+                row_count=counters.rows,
+                recompute_count=counters.recomputes,
+            )
+            return res
+        return wrapper
+    return decorator
+
+
+class ProjectPerfLog(models.Model):
+    _name = 'project.perf.log'
+    _description = 'Jurnal profilare'
+    _order = 'id desc'
+    _log_access = False
+
+    name = fields.Char(string="Operațiune", required=True, index=True, readonly=True)
+    model = fields.Char(string="Model", readonly=True)
+    res_ids = fields.Char(string="Înregistrări", readonly=True)
+    user_id = fields.Many2one('res.users', string="Utilizator", readonly=True)
+    date = fields.Datetime(string="Data", readonly=True, index=True)
+    duration_ms = fields.Float(string="Durată (ms)", digits=(16, 1), aggregator='avg', readonly=True)
+    query_count = fields.Integer(string="Interogări SQL", aggregator='avg', readonly=True)
+    row_count = fields.Integer(string="Rânduri SQL", aggregator='avg', readonly=True)
+    recompute_count = fields.Integer(string="Recalculări câmpuri", aggregator='avg', readonly=True)
+
+    @api.model
+    def _record(self, name, model, res_ids, duration, query_count, row_count, recompute_count):
+        ids = ",".join(str(rid) for rid in res_ids[:20] if isinstance(rid, int))
+        if len(res_ids) > 20:
+            ids += ",... (%d)" % len(res_ids)
+        _logger.info(
+            "%s [%s %s]: %.1f ms, %d interogări, %d rânduri, %d recalculări",
+            name, model, ids, duration * 1000.0, query_count, row_count, recompute_count,
+        )
+        return self.create({
+            'name': name,
+            'model': model,
+            'res_ids': ids,
+            'user_id': self.env.uid,
+            'date': fields.Datetime.now(),
+            'duration_ms': duration * 1000.0,
+            'query_count': query_count,
+            'row_count': row_count,
+            'recompute_count': recompute_count,
+        })
+
+    @api.autovacuum
+    def _gc_old_logs(self):
+        limit = fields.Datetime.now() - timedelta(days=PERF_LOG_RETENTION_DAYS)
+        self.search([('date', '<', limit)]).unlink()
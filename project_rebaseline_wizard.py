@@ -0,0 +1,185 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools import split_every
+from odoo.tools.safe_eval import safe_eval
+import time
+
+from .project_funding import PROJECT_LIFECYCLE_CHUNK
+from .project_perf import profiled
+
+# Datele proiectului care pot fi decalate de wizard
+REBASELINE_DATE_FIELDS = {
+    'depunere': 'data_depunere',
+    'semnare': 'data_semnare',
+    'finalizare': 'data_finalizare',
+}
+
+
+class ProjectRebaselineWizard(models.TransientModel):
+    """Decalează datele unui set de proiecte și recalculează calendarul o singură dată.
+
+    Datele proiectelor se modifică printr-un UPDATE pe lot, apoi activitățile și
+    achizițiile dependente se recalculează cu project.funding._recompute_schedule
+    (o trecere pe proiect, fără recalculări în lanț în ORM).
+    """
+    _name = 'project.rebaseline.wizard'
+    _description = 'Replanificare proiecte'
+
+    project_ids = fields.Many2many(
+        'project.funding',
+        string="Proiecte",
+        help="Proiectele selectate. Dacă lista este goală, se folosește domeniul de mai jos.",
+    )
+    project_domain = fields.Char(
+        string="Domeniu proiecte",
+        default="[]",
+    )
+    date_field = fields.Selection(
+        [
+            ('depunere', 'Data depunerii'),
+            ('semnare', 'Data semnării'),
+            ('finalizare', 'Data finalizării'),
+            ('all', 'Toate datele proiectului'),
+        ],
+        string="Dată proiect",
+        default='semnare',
+        required=True,
+    )
+    mode = fields.Selection(
+        [
+            ('shift', 'Decalează cu un număr de zile'),
+            ('set', 'Setează o dată nouă'),
+        ],
+        string="Mod",
+        default='shift',
+        required=True,
+    )
+    shift_days = fields.Integer(string="Decalaj (zile)", help="Număr de zile (+/-).")
+    new_date = fields.Date(string="Dată nouă")
+    report = fields.Text(string="Raport replanificare", readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            self.env.context.get('active_model') == 'project.funding'
+            and self.env.context.get('active_ids')
+        ):
+            res['project_ids'] = [(6, 0, self.env.context['active_ids'])]
+        return res
+
+    def _get_projects(self):
+        self.ensure_one()
+        if self.project_ids:
+            return self.project_ids
+        domain = safe_eval(self.project_domain or '[]')
+        return self.env['project.funding'].search(domain, order='cod, id')
+
+    def _date_columns(self):
+        self.ensure_one()
+        if self.date_field == 'all':
+            return list(REBASELINE_DATE_FIELDS.values())
+        return [REBASELINE_DATE_FIELDS[self.date_field]]
+
+    def _shift_project_dates(self, projects):
+        """Aplică decalajul / data nouă printr-un UPDATE; returnează {id: (cod, [(câmp, vechi, nou)])}."""
+        # UPDATE-ul direct ocolește ORM-ul: drepturile de scriere se verifică explicit
+        projects = projects.exists()
+        if not projects:
+            return {}
+        projects.check_access('write')
+        columns = self._date_columns()
+        cr = self.env.cr
+        projects.flush_recordset(columns)
+        cr.execute(
+            "SELECT id, cod, %s FROM project_funding WHERE id IN %%s" % ", ".join(columns),
+            [tuple(projects.ids)],
+        )
+        before = {row[0]: row[1:] for row in cr.fetchall()}
+
+        if self.mode == 'shift':
+            assignments = ", ".join("%s = %s + %%(days)s" % (col, col) for col in columns)
+        else:
+            assignments = ", ".join("%s = %%(date)s" % col for col in columns)
+        cr.execute(
+            """
+            UPDATE project_funding
+               SET %s,
+                   write_uid = %%(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE id IN %%(ids)s
+         RETURNING id, %s
+            """ % (assignments, ", ".join(columns)),
+            {'days': self.shift_days, 'date': self.new_date, 'uid': self.env.uid, 'ids': tuple(projects.ids)},
+        )
+        changes = {}
+        for project_id, *new_values in cr.fetchall():
+            cod, *old_values = before[project_id]
+            changes[project_id] = (cod, [
+                (col, old, new)
+                for col, old, new in zip(columns, old_values, new_values)
+                if old != new
+            ])
+        projects.invalidate_recordset(columns + ['write_uid', 'write_date'])
+        return changes
+
+    @profiled('Replanificare proiecte')
+    def action_apply(self):
+        self.ensure_one()
+        if self.mode == 'shift' and not self.shift_days:
+            raise ValidationError("Introduceți un decalaj diferit de 0 zile.")
+        if self.mode == 'set' and not self.new_date:
+            raise ValidationError("Introduceți data nouă.")
+
+        projects = self._get_projects()
+        if not projects:
+            raise ValidationError("Nu există proiecte pentru replanificare.")
+
+        started = time.perf_counter()
+        report = []
+        totals = {'projects': 0, 'project.activity': 0, 'project.acquisition': 0}
+        for chunk_ids in split_every(PROJECT_LIFECYCLE_CHUNK, projects.ids):
+            chunk = self.env['project.funding'].browse(chunk_ids)
+            project_changes = self._shift_project_dates(chunk)
+            schedule_changes = chunk._recompute_schedule()
+
+            per_project = {}
+            for model, model_changes in schedule_changes.items():
+                totals[model] += len(model_changes)
+                for change in model_changes:
+                    per_project.setdefault(change[1], {}).setdefault(model, 0)
+                    per_project[change[1]][model] += 1
+
+            for project_id in chunk_ids:
+                cod, date_changes = project_changes.get(project_id, ('', []))
+                if not date_changes:
+                    continue
+                totals['projects'] += 1
+                counts = per_project.get(project_id, {})
+                report.append("%s: %s; activități modificate: %d, achiziții modificate: %d." % (
+                    cod or project_id,
+                    ", ".join("%s %s → %s" % (col, old or '-', new or '-') for col, old, new in date_changes),
+                    counts.get('project.activity', 0),
+                    counts.get('project.acquisition', 0),
+                ))
+            self.env.invalidate_all()
+
+        header = (
+            "Proiecte replanificate: %d din %d. Activități modificate: %d. "
+            "Achiziții modificate: %d. Durată: %.2f s."
+            % (
+                totals['projects'], len(projects), totals['project.activity'],
+                totals['project.acquisition'], time.perf_counter() - started,
+            )
+        )
+        max_lines = 1000
+        if len(report) > max_lines:
+            report = report[:max_lines] + ["... și încă %d proiecte." % (len(report) - max_lines)]
+        self.report = "\n".join([header, ""] + report)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.rebaseline.wizard',
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
@@ -0,0 +1,192 @@
+"""Motor de planificare: calculează datele activităților / achizițiilor unui proiect
+într-o singură trecere, în memorie, fără ORM.
+
+O regulă de dată este un tuplu (source_type, project_ref, ref_id, ref_type, offset_days):
+  - source_type 'project': data proiectului indicată de project_ref + offset;
+  - source_type 'activity': data de început / sfârșit (ref_type) a activității ref_id + offset.
+"""
+from collections import deque
+from datetime import timedelta
+
+# Referințele la datele proiectului (achizițiile folosesc 'contractare' pentru semnare)
+PROJECT_DATE_REFS = {
+    'depunere': 'data_depunere',
+    'semnare': 'data_semnare',
+    'contractare': 'data_semnare',
+    'finalizare': 'data_finalizare',
+}
+
+# Coloanele care descriu regulile de dată, comune activităților și achizițiilor
+RULE_COLUMNS = [
+    'start_source_type', 'start_project_ref', 'start_activity_id',
+    'start_activity_ref_type', 'start_offset_days',
+    'end_source_type', 'end_project_ref', 'end_activity_id',
+    'end_activity_ref_type', 'end_offset_days',
+]
+
+
+def rules_from_row(row):
+    """(regula început, regula sfârșit) dintr-un dict cu coloanele RULE_COLUMNS."""
+    return tuple(
+        (
+            row['%s_source_type' % side],
+            row['%s_project_ref' % side],
+            row['%s_activity_id' % side] or False,
+            row['%s_activity_ref_type' % side],
+            row['%s_offset_days' % side] or 0,
+        )
+        for side in ('start', 'end')
+    )
+
+
+def rule_date(rule, project_dates, activity_dates):
+    """Data dată de o regulă; False dacă data de referință lipsește.
+
+    `project_dates`: dict cu data_depunere / data_semnare / data_finalizare;
+    `activity_dates`: dict id activitate -> (date_start, date_end).
+    """
+    source_type, project_ref, ref_id, ref_type, offset = rule
+    base = False
+    if source_type == 'project':
+        base = project_dates.get(PROJECT_DATE_REFS.get(project_ref))
+    elif source_type == 'activity' and ref_id:
+        dates = activity_dates.get(ref_id)
+        if dates:
+            base = dates[0] if ref_type == 'start' else dates[1]
+    return base + timedelta(days=offset or 0) if base else False
+
+
+def topological_order(dependencies):
+    """Ordonează nodurile astfel încât fiecare nod vine după dependențele sale (Kahn).
+
+    `dependencies`: dict nod -> set de noduri de care depinde (doar cele din graf contează).
+    Nodurile prinse într-un ciclu sunt adăugate la final, în ordinea inițială.
+    """
+    pending = {node: {dep for dep in deps if dep in dependencies and dep != node}
+               for node, deps in dependencies.items()}
+    dependents = {node: [] for node in dependencies}
+    for node, deps in pending.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    queue = deque(node for node, deps in pending.items() if not deps)
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for child in dependents[node]:
+            pending[child].discard(node)
+            if not pending[child]:
+                queue.append(child)
+    if len(order) < len(pending):
+        placed = set(order)
+        order += [node for node in dependencies if node not in placed]
+    return order
+
+
+def compute_schedule(project_dates, activity_rules, acquisition_rules=None, known_dates=None):
+    """Calculează toate datele unui proiect într-o singură trecere.
+
+    `activity_rules` / `acquisition_rules`: dict id -> (regula început, regula sfârșit).
+    `known_dates`: datele (start, end) ale activităților referite, dar care nu se recalculează.
+    Returnează (date activități, date achiziții), ca dict id -> (date_start, date_end).
+    """
+    activity_dates = dict(known_dates or {})
+    dependencies = {
+        act_id: {rule[2] for rule in rules if rule[0] == 'activity' and rule[2]}
+        for act_id, rules in activity_rules.items()
+    }
+    computed = {}
+    for act_id in topological_order(dependencies):
+        start_rule, end_rule = activity_rules[act_id]
+        # data de început se calculează prima, ca sfârșitul să o poată folosi
+        date_start = rule_date(start_rule, project_dates, activity_dates)
+        activity_dates[act_id] = (date_start, activity_dates.get(act_id, (False, False))[1])
+        date_end = rule_date(end_rule, project_dates, activity_dates)
+        activity_dates[act_id] = computed[act_id] = (date_start, date_end)
+
+    acquisitions = {
+        acq_id: (
+            rule_date(start_rule, project_dates, activity_dates),
+            rule_date(end_rule, project_dates, activity_dates),
+        )
+        for acq_id, (start_rule, end_rule) in (acquisition_rules or {}).items()
+    }
+    return computed, acquisitions
+
+
+def find_cycle(dependencies):
+    """Primul ciclu găsit în graf, ca listă [n1, n2, ..., n1]; None dacă graful este aciclic.
+
+    `dependencies`: dict nod -> set de noduri referite. Auto-referința (n -> n) este un ciclu.
+    Parcurgere DFS iterativă, fiecare nod este vizitat o singură dată.
+    """
+    done = set()
+    for root in dependencies:
+        if root in done:
+            continue
+        path = [root]
+        position = {root: 0}
+        stack = [iter(dependencies.get(root, ()))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                finished = path.pop()
+                del position[finished]
+                done.add(finished)
+                continue
+            if node in position:
+                return path[position[node]:] + [node]
+            if node in done:
+                continue
+            position[node] = len(path)
+            path.append(node)
+            stack.append(iter(dependencies.get(node, ())))
+    return None
+
+
+def critical_path(items, project_finish=False):
+    """Analiză CPM peste activitățile și achizițiile unui proiect.
+
+    `items`: dict cheie -> {'start': dată, 'end': dată, 'edges': [(predecesor, ancoră
+    predecesor, ancoră proprie, decalaj zile)]}, ancorele fiind 'start' / 'end'.
+    Datele calculate de reguli sunt datele timpurii; datele târzii se calculează
+    înapoi, de la finalul proiectului, respectând decalajul fiecărei legături
+    (offset-ul regulii de dată, respectiv 0 pentru dependențele între achiziții).
+
+    Returnează dict cheie -> (început timpuriu, sfârșit timpuriu, început târziu,
+    sfârșit târziu, rezervă totală în zile, critic). Elementele fără date sunt omise.
+    """
+    dated = {key: item for key, item in items.items() if item['start'] and item['end']}
+    if not dated:
+        return {}
+
+    successors = {key: [] for key in dated}
+    dependencies = {key: set() for key in dated}
+    for key, item in dated.items():
+        for pred, pred_anchor, own_anchor, lag in item['edges']:
+            if pred in dated and pred != key:
+                successors[pred].append((key, pred_anchor, own_anchor, timedelta(days=lag or 0)))
+                dependencies[key].add(pred)
+
+    finish = max(item['end'] for item in dated.values())
+    if project_finish and project_finish > finish:
+        finish = project_finish
+
+    late = {}
+    for key in reversed(topological_order(dependencies)):
+        item = dated[key]
+        duration = max(item['end'] - item['start'], timedelta(0))
+        late_finish = finish
+        for succ, pred_anchor, succ_anchor, lag in successors[key]:
+            bound = late[succ][0 if succ_anchor == 'start' else 1] - lag
+            late_finish = min(late_finish, bound + duration if pred_anchor == 'start' else bound)
+        late[key] = (late_finish - duration, late_finish)
+
+    result = {}
+    for key, item in dated.items():
+        late_start, late_finish = late[key]
+        slack = (late_start - item['start']).days
+        result[key] = (item['start'], item['end'], late_start, late_finish, slack, slack <= 0)
+    return result
@@ -0,0 +1,5 @@
+from . import test_aport
+from . import test_budget_revision
+from . import test_budget_rollup
+from . import test_performance
+from . import test_schedule
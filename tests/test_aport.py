@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+from odoo.tests.common import BaseCase
+
+from ..project_funding import _largest_remainder_split
+
+
+@tagged('post_install', '-at_install')
+class TestLargestRemainderSplit(BaseCase):
+
+    def test_sum_is_exact(self):
+        for total, weights in [
+            (5000, [10001, 3333, 6666]),
+            (1, [1, 1, 1]),
+            (99999, [7, 13, 17, 19, 23, 29]),
+            (333, [1] * 7),
+        ]:
+            shares = _largest_remainder_split(total, weights)
+            self.assertEqual(sum(shares), total)
+            self.assertEqual(len(shares), len(weights))
+
+    def test_proportional_within_one_unit(self):
+        weights = [10001, 3333, 6666]
+        shares = _largest_remainder_split(5000, weights)
+        for share, weight in zip(shares, weights):
+            self.assertLessEqual(abs(share - 5000 * weight / sum(weights)), 1)
+
+    def test_ties_go_in_list_order(self):
+        self.assertEqual(_largest_remainder_split(2, [1, 1, 1]), [1, 1, 0])
+
+    def test_zero_weights(self):
+        self.assertEqual(_largest_remainder_split(100, [0, 0]), [0, 0])
+
+
+@tagged('post_install', '-at_install')
+class TestAportDistribution(TransactionCase):
+
+    def _project(self, cod, aport, amounts):
+        project = self.env['project.funding'].create({'cod': cod, 'aport_valoare': aport})
+        self.env['project.budget'].create([
+            {
+                'project_id': project.id,
+                'chapter': '1',
+                'subchapter': str(idx),
+                'name': 'Linie %d' % idx,
+                'chelt_elig_baza': baza,
+                'chelt_elig_tva': tva,
+            }
+            for idx, (baza, tva) in enumerate(amounts, start=1)
+        ])
+        self.env.flush_all()
+        return project
+
+    def _aport_lines(self, project):
+        self.env.invalidate_all()
+        return project.budget_line_ids.sorted('id').mapped('total_chelt_eligibile_aport')
+
+    def test_distribution_sums_exactly_to_aport(self):
+        project = self._project('APORT-1', 50.0, [(84.04, 15.97), (28.01, 5.32), (56.02, 10.64)])
+        project.action_distribute_aport()
+        self.env.invalidate_all()
+        lines = project.budget_line_ids
+        self.assertEqual(round(sum(lines.mapped('total_chelt_eligibile_aport')) * 100), 5000)
+        for line in lines:
+            elig = round((line.chelt_elig_baza + line.chelt_elig_tva) * 100)
+            self.assertEqual(
+                round(line.total_chelt_eligibile_aport * 100) + round(line.total_chelt_eligibile_neramb * 100),
+                elig,
+            )
+
+    def test_zero_eligible_is_skipped(self):
+        project = self._project('APORT-0', 10.0, [(0.0, 0.0)])
+        self.assertEqual(project._aport_skip_reason(), 'no_eligible')
+        result = project.action_distribute_aport()
+        self.assertEqual(result['params']['type'], 'warning')
+        self.assertEqual(self._aport_lines(project), [0.0])
+
+    def test_negative_aport_is_skipped(self):
+        project = self._project('APORT-NEG', -10.0, [(100.0, 19.0)])
+        self.assertEqual(project._aport_skip_reason(), 'no_aport')
+        project.action_distribute_aport()
+        self.assertEqual(self._aport_lines(project), [0.0])
+
+    def test_aport_above_eligible_is_rejected(self):
+        project = self._project('APORT-MARE', 500.0, [(100.0, 19.0)])
+        with self.assertRaises(ValidationError):
+            project.action_distribute_aport()
+
+    def test_batch_rolls_back_only_the_failing_project(self):
+        good = self._project('LOT-OK', 30.0, [(100.0, 0.0), (200.0, 0.0)])
+        bad = self._project('LOT-EROARE', 30.0, [(100.0, 0.0), (200.0, 0.0)])
+        skipped = self._project('LOT-SARIT', 0.0, [(100.0, 0.0)])
+
+        Project = type(self.env['project.funding'])
+        reset = Project._reset_deviz_fingerprint
+
+        def _reset(records):
+            # eroarea apare după UPDATE-ul liniilor, deci trebuie anulat doar savepoint-ul proiectului
+            if bad in records:
+                raise ValidationError("Eroare simulată")
+            return reset(records)
+
+        with patch.object(Project, '_reset_deviz_fingerprint', autospec=True, side_effect=_reset), \
+                patch.object(self.env.cr, 'commit'):
+            result = (good | bad | skipped).action_distribute_aport_batch()
+
+        message = result['params']['message']
+        self.assertIn("Proiecte actualizate: 1.", message)
+        self.assertIn("Proiecte sărite (total eligibil 0 sau fără aport): 1.", message)
+        self.assertIn("Proiecte eșuate: 1.", message)
+        self.assertEqual(self._aport_lines(good), [10.0, 20.0])
+        self.assertEqual(self._aport_lines(bad), [0.0, 0.0])
+        self.assertEqual(self._aport_lines(skipped), [0.0])
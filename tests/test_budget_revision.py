@@ -0,0 +1,124 @@
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+from ..project_budget_revision import REVISION_KEYFRAME_INTERVAL
+
+
+@tagged('post_install', '-at_install')
+class TestBudgetRevision(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.funding'].create({'cod': 'REVIZII'})
+        cls.Revision = cls.env['project.budget.revision']
+
+    def _line(self, chapter, subchapter, elig=0.0, name=False):
+        return {
+            'project_id': self.project.id,
+            'chapter': chapter,
+            'subchapter': subchapter,
+            'name': name or 'Linie %s.%s' % (chapter, subchapter),
+            'chelt_elig_baza': elig,
+            'chelt_elig_tva': round(elig * 0.19, 2),
+            'tip_cheltuiala': 'Directa',
+        }
+
+    def _by_nr_crt(self, nr_crt):
+        return self.project.budget_line_ids.filtered(lambda line: line.nr_crt == nr_crt)
+
+    def test_round_trip_across_keyframes(self):
+        Budget = self.env['project.budget']
+        Budget.create([self._line('1', str(idx), elig=100.0 * idx) for idx in range(1, 4)])
+        steps = [
+            lambda: Budget.create([self._line('2', '1', elig=40.0)]),
+            lambda: self._by_nr_crt('1.1').write({'chelt_elig_baza': 150.0}),
+            lambda: self._by_nr_crt('1.2').unlink(),
+            lambda: self._by_nr_crt('1.3').write({'name': 'Redenumită', 'mysmis': 'Lucrari'}),
+            lambda: None,  # revizie fără modificări
+            lambda: Budget.create([self._line('3', str(idx), elig=10.0) for idx in range(1, 4)]),
+            lambda: self._by_nr_crt('3.2').write({'subchapter': '7'}),
+            # Nr. crt șters anterior revine cu alte valori
+            lambda: Budget.create([self._line('1', '2', elig=5.0)]),
+            lambda: self.project.budget_line_ids.write({'total_chelt_eligibile_aport': 1.0}),
+            # revizia 11 este keyframe
+            lambda: self._by_nr_crt('2.1').write({'chelt_elig_tva': 0.0}),
+            lambda: (self._by_nr_crt('3.1') | self._by_nr_crt('3.3')).unlink(),
+            lambda: Budget.create([self._line(False, False, elig=1.0, name='Fără Nr. crt')]),
+            lambda: self.project.budget_line_ids.unlink(),
+        ]
+
+        expected = []
+        revisions = self.Revision
+        for step in [lambda: None] + steps:
+            step()
+            expected.append(self.Revision._current_lines(self.project))
+            revisions |= self.Revision._snapshot(self.project, "Pas %d" % len(expected))
+        self.assertGreater(len(revisions), REVISION_KEYFRAME_INTERVAL)
+
+        self.assertEqual(revisions.mapped('sequence'), list(range(1, len(expected) + 1)))
+        self.assertEqual(
+            revisions.filtered('is_keyframe').mapped('sequence'),
+            [seq for seq in revisions.mapped('sequence') if seq % REVISION_KEYFRAME_INTERVAL == 1],
+        )
+        for revision, lines in zip(revisions, expected):
+            self.assertEqual(revision._get_lines(), lines, "Revizia %d" % revision.sequence)
+            self.assertEqual(revision.line_count, len(lines))
+        # mai multe revizii dintr-o singură trecere, peste un keyframe
+        sequences = {2, 10, 11, 13}
+        states = revisions[0]._load_states(sequences)
+        self.assertEqual(states, {seq: expected[seq - 1] for seq in sequences})
+
+    def test_diff_between_revisions_and_current(self):
+        Budget = self.env['project.budget']
+        Budget.create([
+            self._line('1', '1', elig=100.0),
+            self._line('1', '2', elig=50.0),
+            self._line('2', '1', elig=20.0, name='Veche'),
+        ])
+        first = self.Revision._snapshot(self.project)
+        self._by_nr_crt('1.1').write({'chelt_elig_baza': 120.0})
+        self._by_nr_crt('1.2').unlink()
+        Budget.create([self._line('3', '1', elig=30.0)])
+        second = self.Revision._snapshot(self.project)
+
+        diff = first._diff(second)
+        self.assertEqual([key for key, _values in diff['added']], ['3.1'])
+        self.assertEqual([key for key, _values in diff['removed']], ['1.2'])
+        self.assertEqual(diff['changed'], [('1.1', [('chelt_elig_baza', 100.0, 120.0)])])
+        self.assertEqual(diff['unchanged'], 1)
+
+        # fără `other`, comparația se face cu devizul curent
+        self._by_nr_crt('2.1').write({'name': 'Nouă'})
+        diff = second._diff()
+        self.assertEqual(diff['added'], [])
+        self.assertEqual(diff['removed'], [])
+        self.assertEqual(diff['changed'], [('2.1', [('name', 'Veche', 'Nouă')])])
+        self.assertEqual(diff['unchanged'], 2)
+
+        report = first._diff_report(second)
+        self.assertIn("Linii noi: 1. Linii modificate: 1. Linii neschimbate: 1. Linii șterse: 1.", report)
+
+        other = self.env['project.funding'].create({'cod': 'REVIZII-ALT'})
+        self.env['project.budget'].create([dict(self._line('1', '1'), project_id=other.id)])
+        with self.assertRaises(ValidationError):
+            first._diff(self.Revision._snapshot(other))
+
+    def test_only_latest_revision_can_be_deleted(self):
+        self.env['project.budget'].create([self._line('1', '1', elig=10.0)])
+        revisions = self.Revision
+        for _idx in range(3):
+            revisions |= self.Revision._snapshot(self.project)
+        first, middle, last = revisions
+
+        with self.assertRaisesRegex(ValidationError, 'ultima revizie'):
+            middle.unlink()
+        with self.assertRaisesRegex(ValidationError, 'ultima revizie'):
+            (first | last).unlink()
+
+        last.unlink()
+        middle.unlink()
+        self.assertEqual(first._get_lines(), self.Revision._current_lines(self.project))
+        # ștergerea tuturor reviziilor odată este permisă
+        (first | self.Revision._snapshot(self.project)).unlink()
+        self.assertFalse(self.project.budget_revision_ids)
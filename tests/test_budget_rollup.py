@@ -0,0 +1,84 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestBudgetRollup(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = cls.env['project.funding'].create({'cod': 'ROLLUP-1'})
+        cls.second = cls.env['project.funding'].create({'cod': 'ROLLUP-2'})
+
+    def _line(self, project, chapter, subchapter, elig=0.0, neelig=0.0):
+        return {
+            'project_id': project.id,
+            'chapter': chapter,
+            'subchapter': subchapter,
+            'name': 'Linie %s %s' % (chapter, subchapter),
+            'chelt_elig_baza': elig,
+            'chelt_elig_tva': round(elig * 0.19, 2),
+            'chelt_neelig_baza': neelig,
+            'chelt_neelig_tva': round(neelig * 0.19, 2),
+        }
+
+    def _rollup_rows(self):
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT project_id, chapter, subchapter_prefix, line_count,
+                   round(total_eligibil::numeric, 2), round(total_neeligibil::numeric, 2),
+                   round(total_tva::numeric, 2), round(total::numeric, 2)
+              FROM project_budget_rollup
+             WHERE project_id IN %s
+          ORDER BY project_id, chapter, subchapter_prefix
+            """,
+            [(self.first.id, self.second.id)],
+        )
+        return self.env.cr.fetchall()
+
+    def assertRollupMatchesRebuild(self):
+        incremental = self._rollup_rows()
+        self.env['project.budget.rollup']._rebuild()
+        self.assertEqual(incremental, self._rollup_rows())
+
+    def test_incremental_matches_rebuild(self):
+        Budget = self.env['project.budget']
+        lines = Budget.create([
+            self._line(self.first, '1', '1.1', elig=100.0),
+            self._line(self.first, '1', '1.2', elig=50.0, neelig=10.0),
+            self._line(self.first, '2', '2.1', elig=200.0),
+            self._line(self.first, ' 3 ', None, neelig=40.0),
+            self._line(self.second, '1', '1.1', elig=75.0),
+            self._line(self.second, '4', '4.1.2', elig=12.5),
+        ])
+        self.assertRollupMatchesRebuild()
+
+        # sume fără schimbarea cheii
+        lines[0].write({'chelt_elig_baza': 120.0, 'chelt_neelig_baza': 5.0})
+        # schimbare de capitol și subcapitol, cu și fără sume
+        lines[1].write({'chapter': '2', 'subchapter': '2.4'})
+        lines[2].write({'subchapter': '2.9', 'chelt_elig_tva': 0.0})
+        # mutare pe alt proiect (Nr. crt «3» e liber acolo)
+        lines[3].write({'project_id': self.second.id})
+        # câmp care nu influențează subtotalurile
+        lines[4].write({'name': 'Redenumită'})
+        self.assertRollupMatchesRebuild()
+
+        # ștergere, inclusiv a ultimei linii dintr-un subtotal
+        (lines[0] | lines[5]).unlink()
+        Budget.create([self._line(self.second, '4', '4.2', elig=30.0)])
+        self.assertRollupMatchesRebuild()
+
+    def test_multi_record_write_matches_rebuild(self):
+        lines = self.env['project.budget'].create([
+            self._line(self.first, '1', '1.%d' % idx, elig=10.0 * idx)
+            for idx in range(1, 6)
+        ])
+        lines[:3].write({'chapter': '5', 'chelt_elig_baza': 1.0})
+        lines[3:].write({'project_id': self.second.id})
+        self.assertRollupMatchesRebuild()
+
+        lines.unlink()
+        self.assertEqual(self._rollup_rows(), [])
+        self.assertRollupMatchesRebuild()
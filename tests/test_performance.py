@@ -0,0 +1,128 @@
+"""Benchmark-uri de performanță, rulate doar la cerere:
+
+    odoo-bin -d <db> -i project_funding --test-tags /project_funding:project_funding_perf
+"""
+import base64
+import logging
+import statistics
+import time
+
+from odoo.tests import TransactionCase, tagged
+
+from ..project_deviz_wizard import IMPORT_BATCH_SIZE
+
+_logger = logging.getLogger(__name__)
+
+# Bugetul de interogări SQL pe linie importată (importul pe loturi nu depinde de numărul de linii)
+IMPORT_QUERIES_PER_ROW = 0.1
+
+# Volumul de proiecte și latența maximă (mediană) pentru autocompletarea ranked
+SEARCH_PROJECT_COUNT = 100000
+SEARCH_LATENCY_BUDGET = 0.05
+
+
+@tagged('post_install', '-at_install', '-standard', 'project_funding_perf')
+class TestDevizImportPerformance(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.funding'].create({'cod': 'PERF-IMPORT'})
+
+    def _csv_file(self, nb_rows):
+        lines = ["chapter;subchapter;name;chelt_elig_baza;chelt_elig_tva;chelt_neelig_baza;chelt_neelig_tva"]
+        lines += [
+            "%d;%d.%d;Linie %d;%d.50;%d.10;0;0" % (idx // 100 + 1, idx // 100 + 1, idx % 100 + 1, idx, idx, idx)
+            for idx in range(nb_rows)
+        ]
+        return base64.b64encode("\n".join(lines).encode('utf-8'))
+
+    def _import(self, nb_rows):
+        """Importă `nb_rows` linii (mod «înlocuiește»); returnează (interogări SQL, durată)."""
+        wizard = self.env['project.deviz.import.wizard'].create({
+            'project_id': self.project.id,
+            'file_data': self._csv_file(nb_rows),
+            'file_name': 'deviz.csv',
+            'import_mode': 'replace',
+            'confirm_override': True,
+        })
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        started = time.perf_counter()
+        wizard.action_import()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - queries, time.perf_counter() - started
+
+    def test_import_queries_per_row(self):
+        nb_rows = 2 * IMPORT_BATCH_SIZE
+        with self.assertQueryCount(int(nb_rows * IMPORT_QUERIES_PER_ROW)):
+            nb_queries, duration = self._import(nb_rows)
+        self.assertEqual(len(self.project.budget_line_ids), nb_rows)
+        _logger.info(
+            "Import deviz: %d linii în %.2fs, %d interogări SQL (%.3f / linie)",
+            nb_rows, duration, nb_queries, nb_queries / nb_rows,
+        )
+
+    def test_import_queries_per_batch(self):
+        # un lot în plus adaugă un număr constant de interogări, nu unul proporțional cu liniile
+        small, _duration = self._import(IMPORT_BATCH_SIZE)
+        large, _duration = self._import(3 * IMPORT_BATCH_SIZE)
+        per_batch = (large - small) / 2
+        _logger.info("Import deviz: %.1f interogări SQL per lot de %d linii", per_batch, IMPORT_BATCH_SIZE)
+        self.assertLessEqual(per_batch, IMPORT_BATCH_SIZE * IMPORT_QUERIES_PER_ROW)
+
+
+@tagged('post_install', '-at_install', '-standard', 'project_funding_perf')
+class TestProjectSearchPerformance(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # proiectele se inserează direct în SQL: volumul ar face seed-ul prin ORM prea lent
+        cls.env.cr.execute(
+            """
+            INSERT INTO project_funding (cod, beneficiar, denumire, active, create_uid, write_uid,
+                                         create_date, write_date)
+            SELECT 'SMIS-' || n,
+                   'Beneficiar ' || (n %% 5000),
+                   'Proiect modernizare ' || md5(n::text),
+                   TRUE, %(uid)s, %(uid)s,
+                   now() at time zone 'UTC', now() at time zone 'UTC'
+              FROM generate_series(1, %(count)s) AS n
+            """,
+            {'uid': cls.env.uid, 'count': SEARCH_PROJECT_COUNT},
+        )
+        cls.env.cr.execute("ANALYZE project_funding")
+
+    def _measure(self, search, repeat=5):
+        """Mediana duratei și numărul de interogări ale unei căutări; returnează și rezultatul."""
+        durations = []
+        for _i in range(repeat):
+            self.env.invalidate_all()
+            queries = self.env.cr.sql_log_count
+            started = time.perf_counter()
+            records = search()
+            durations.append(time.perf_counter() - started)
+            nb_queries = self.env.cr.sql_log_count - queries
+        return statistics.median(durations), nb_queries, records
+
+    def test_ranked_search_vs_ilike(self):
+        Project = self.env['project.funding']
+        if not self.env.registry.has_trigram:
+            self.skipTest("Extensia pg_trgm nu este instalată.")
+
+        name = 'SMIS-4242'
+        domain = ['|', '|', ('cod', 'ilike', name), ('beneficiar', 'ilike', name), ('denumire', 'ilike', name)]
+        legacy, legacy_queries, _records = self._measure(lambda: Project.search(domain, limit=8))
+        ranked, ranked_queries, records = self._measure(lambda: Project._search_ranked(name, domain, limit=8))
+        _logger.info(
+            "Căutare proiect «%s» (%d proiecte): ilike %.1f ms / %d interogări, "
+            "ranked (trigram) %.1f ms / %d interogări",
+            name, SEARCH_PROJECT_COUNT, legacy * 1000.0, legacy_queries,
+            ranked * 1000.0, ranked_queries,
+        )
+
+        self.assertEqual(records[:1].cod, name, "Codul identic trebuie să fie primul rezultat.")
+        self.assertLessEqual(ranked_queries, 2)
+        self.assertLess(ranked, SEARCH_LATENCY_BUDGET)
@@ -0,0 +1,138 @@
+from datetime import date
+
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+from odoo.tests.common import BaseCase
+
+from ..project_schedule import compute_schedule, find_cycle, topological_order
+
+PROJECT_DATES = {
+    'data_depunere': date(2025, 1, 1),
+    'data_semnare': date(2025, 3, 1),
+    'data_finalizare': date(2026, 3, 1),
+}
+
+
+def _project(ref, offset=0):
+    return ('project', ref, False, 'start', offset)
+
+
+def _activity(act_id, ref_type, offset=0):
+    return ('activity', False, act_id, ref_type, offset)
+
+
+@tagged('post_install', '-at_install')
+class TestScheduleEngine(BaseCase):
+
+    def test_topological_order(self):
+        order = topological_order({1: {2, 3}, 2: {4}, 3: {4}, 4: set()})
+        self.assertEqual(order[0], 4)
+        self.assertEqual(order[-1], 1)
+        self.assertLess(order.index(2), order.index(1))
+        self.assertLess(order.index(3), order.index(1))
+
+    def test_topological_order_ignores_outside_and_self_references(self):
+        self.assertEqual(topological_order({1: {1, 99}, 2: {1}}), [1, 2])
+
+    def test_topological_order_keeps_cycle_nodes(self):
+        order = topological_order({1: {2}, 2: {1}, 3: set()})
+        self.assertEqual(order[0], 3)
+        self.assertCountEqual(order, [1, 2, 3])
+
+    def test_compute_schedule_chain(self):
+        activities = {
+            3: (_activity(2, 'end'), _project('finalizare')),
+            2: (_activity(1, 'end', 1), _activity(2, 'start', 10)),
+            1: (_project('semnare'), _project('semnare', 30)),
+        }
+        acquisitions = {10: (_activity(3, 'start', -5), _activity(3, 'end'))}
+        computed, acquired = compute_schedule(PROJECT_DATES, activities, acquisitions)
+        self.assertEqual(computed[1], (date(2025, 3, 1), date(2025, 3, 31)))
+        # sfârșitul poate folosi începutul aceleiași activități
+        self.assertEqual(computed[2], (date(2025, 4, 1), date(2025, 4, 11)))
+        self.assertEqual(computed[3], (date(2025, 4, 11), date(2026, 3, 1)))
+        self.assertEqual(acquired[10], (date(2025, 4, 6), date(2026, 3, 1)))
+
+    def test_compute_schedule_missing_dates(self):
+        activities = {1: (_project('semnare'), _activity(99, 'end'))}
+        computed, _acquired = compute_schedule({'data_semnare': False}, activities)
+        self.assertEqual(computed[1], (False, False))
+
+    def test_compute_schedule_known_dates(self):
+        activities = {1: (_activity(5, 'end', 2), _activity(5, 'end', 7))}
+        computed, _acquired = compute_schedule(
+            PROJECT_DATES, activities, known_dates={5: (date(2025, 1, 1), date(2025, 2, 1))},
+        )
+        self.assertEqual(computed, {1: (date(2025, 2, 3), date(2025, 2, 8))})
+
+    def test_find_cycle_self_loop(self):
+        self.assertEqual(find_cycle({1: {1}}), [1, 1])
+
+    def test_find_cycle_diamond_is_acyclic(self):
+        self.assertIsNone(find_cycle({1: {2, 3}, 2: {4}, 3: {4}, 4: set()}))
+
+    def test_find_cycle_long_cycle(self):
+        self.assertEqual(find_cycle({1: {2}, 2: {3}, 3: {4}, 4: {1}}), [1, 2, 3, 4, 1])
+
+    def test_find_cycle_behind_acyclic_part(self):
+        cycle = find_cycle({1: {2}, 2: {3}, 3: {4}, 4: {5}, 5: {3}})
+        self.assertEqual(cycle, [3, 4, 5, 3])
+
+
+@tagged('post_install', '-at_install')
+class TestScheduleReferenceCycles(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.funding'].create({
+            'cod': 'TEST-CICLU',
+            'data_semnare': date(2025, 3, 1),
+        })
+
+    def test_activity_cycle_rejected(self):
+        Activity = self.env['project.activity']
+        first = Activity.create({'project_id': self.project.id, 'name': 'A', 'code': 'A'})
+        second = Activity.create({
+            'project_id': self.project.id, 'name': 'B', 'code': 'B',
+            'start_source_type': 'activity', 'start_activity_id': first.id,
+        })
+        third = Activity.create({
+            'project_id': self.project.id, 'name': 'C', 'code': 'C',
+            'start_source_type': 'activity', 'start_activity_id': second.id,
+        })
+        with self.assertRaisesRegex(ValidationError, 'ciclu'):
+            first.write({'start_source_type': 'activity', 'start_activity_id': third.id})
+
+    def test_activity_self_reference_rejected(self):
+        activity = self.env['project.activity'].create({'project_id': self.project.id, 'name': 'A'})
+        with self.assertRaisesRegex(ValidationError, 'ciclu'):
+            activity.write({'end_source_type': 'activity', 'end_activity_id': activity.id})
+
+    def test_activity_diamond_accepted(self):
+        Activity = self.env['project.activity']
+        root = Activity.create({'project_id': self.project.id, 'name': 'Start'})
+        left = Activity.create({
+            'project_id': self.project.id, 'name': 'Stânga',
+            'start_source_type': 'activity', 'start_activity_id': root.id,
+        })
+        right = Activity.create({
+            'project_id': self.project.id, 'name': 'Dreapta',
+            'start_source_type': 'activity', 'start_activity_id': root.id,
+        })
+        join = Activity.create({
+            'project_id': self.project.id, 'name': 'Final',
+            'start_source_type': 'activity', 'start_activity_id': left.id,
+            'end_source_type': 'activity', 'end_activity_id': right.id,
+        })
+        self.assertEqual(join.date_start, left.date_start)
+
+    def test_template_cycle_rejected(self):
+        Template = self.env['project.activity.template']
+        first = Template.create({'name': 'Șablon A'})
+        second = Template.create({
+            'name': 'Șablon B',
+            'start_source_type': 'activity', 'start_template_id': first.id,
+        })
+        with self.assertRaisesRegex(ValidationError, 'ciclu'):
+            first.write({'end_source_type': 'activity', 'end_template_id': second.id})